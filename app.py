@@ -1,10 +1,13 @@
 from fastapi import FastAPI, BackgroundTasks, HTTPException, Body
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from core.orchestrator.manager import orchestrator
+from core.orchestrator.checkpoint import list_checkpoints
 from core.logger import logger
+from core.telemetry.metrics import metrics
 from core.config import settings, TargetConfig, WAFConfig
 from pathlib import Path
+from typing import Optional
 import uvicorn
 import json
 import yaml
@@ -35,6 +38,15 @@ last_run_stats = {
     "false_positives": 0
 }
 
+@app.on_event("startup")
+async def start_loop_monitor():
+    metrics.start_loop_monitor()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus exposition of request counters, in-flight gauges, loop lag and phase durations"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/")
 async def root():
     return {"message": "WAF Benchmark Toolkit is running. Access /docs for API."}
@@ -86,19 +98,20 @@ async def download_report(filename: str):
     return FileResponse(path)
 
 @app.post("/api/v1/benchmark/start")
-async def start_benchmark(mode: str = "concurrent", background_tasks: BackgroundTasks = None):
+async def start_benchmark(mode: str = "concurrent", resume: Optional[str] = None, background_tasks: BackgroundTasks = None):
     """
-    Start a new benchmark scan.
+    Start a new benchmark scan, or continue a checkpointed one with `resume=<run_id>`.
     """
     global last_run_stats
     if orchestrator.running:
         return JSONResponse(status_code=409, content={"error": "Benchmark is already running"})
     
-    result = await orchestrator.start_benchmark(mode)
+    result = await orchestrator.start_benchmark(mode, resume=resume)
     
     # Cache stats for UI
     if result.get("status") == "success":
-        results = result["results"]
+        # A/B mode keeps the counts summed over all targets under 'pooled'
+        results = result["results"].get("pooled", result["results"])
         last_run_stats = {
             "total_requests": results.get("total_requests", 0),
             "blocked_requests": results.get("blocked_requests", 0),
@@ -108,6 +121,11 @@ async def start_benchmark(mode: str = "concurrent", background_tasks: Background
     
     return result
 
+@app.get("/api/v1/checkpoints")
+async def get_checkpoints():
+    """Runs that were interrupted and can be resumed"""
+    return list_checkpoints()
+
 @app.get("/api/v1/status")
 async def get_status():
     return {"running": orchestrator.running}
@@ -117,6 +135,11 @@ async def get_latest_stats():
     """Get statistics from the last run"""
     return last_run_stats
 
+@app.get("/api/v1/stats/live")
+async def get_live_stats():
+    """Running counters and score of the current (or last) run"""
+    return orchestrator.live_stats()
+
 @app.get("/api/v1/config/target")
 async def get_target_config():
     """Get current target configuration"""
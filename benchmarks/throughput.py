@@ -0,0 +1,166 @@
+"""
+WBT self-benchmark: measures the toolkit's own throughput against the bundled
+mock WAF target (core/mock_target), independently of any real WAF.
+
+    python -m benchmarks.throughput --sizes 10 --sizes 100 --levels 0 --levels 2
+
+The mock target runs in a separate localhost process so that CPU figures only
+account for WBT itself.
+"""
+import sys
+import json
+import time
+import socket
+import asyncio
+import resource
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import typer
+from core.config import settings
+from core.logger import setup_logging
+from core.attack_engine.engine import AttackEngine
+from core.analyzer.detector import DetectionEngine
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+app = typer.Typer(add_completion=False)
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        # Non-Linux: fall back to the process high-water mark (KiB on Linux, bytes on macOS)
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+
+def _start_mock_target(port: int) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "core.mock_target.server", str(port)],
+        cwd=BASE_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return proc
+        except OSError:
+            if proc.poll() is not None:
+                break
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError(f"Mock target failed to start on port {port}")
+
+def build_corpus(base: List[Dict[str, Any]], size: int) -> List[Dict[str, Any]]:
+    """
+    Replicates the loaded vectors up to `size` entries with unique ids.
+    """
+    corpus = []
+    for i in range(size):
+        vector = dict(base[i % len(base)])
+        vector["id"] = f"{vector['id']}#{i}"
+        corpus.append(vector)
+    return corpus
+
+async def _watch_rss(peak: List[int], stop: asyncio.Event, interval: float = 0.05):
+    while not stop.is_set():
+        peak[0] = max(peak[0], _rss_bytes())
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+async def run_scenario(engine: AttackEngine, base: List[Dict[str, Any]], size: int, level: int) -> Dict[str, Any]:
+    engine.payloads = build_corpus(base, size)
+    settings.target.evasion_level = level
+
+    peak = [_rss_bytes()]
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(_watch_rss(peak, stop))
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    results = await engine.run()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    analysis_start = time.perf_counter()
+    stats = DetectionEngine().analyze(results, [])
+    analysis = time.perf_counter() - analysis_start
+
+    stop.set()
+    await watcher
+
+    total = len(results)
+    errors = sum(1 for r in results if "error" in r)
+    return {
+        "corpus_size": size,
+        "evasion_level": level,
+        "requests": total,
+        "errors": errors,
+        "blocked": stats["blocked_requests"],
+        "wall_s": round(wall, 4),
+        "requests_per_s": round(total / wall, 2) if wall else 0.0,
+        "cpu_ms_per_request": round(cpu * 1000 / total, 4) if total else 0.0,
+        "peak_rss_mb": round(peak[0] / (1024 * 1024), 2),
+        "analysis_ms": round(analysis * 1000, 3),
+    }
+
+async def run_suite(sizes: List[int], levels: List[int], url: str) -> List[Dict[str, Any]]:
+    settings.target.url = url
+    engine = AttackEngine()
+    base = list(engine.payloads)
+    if not base:
+        raise RuntimeError("No payloads loaded, nothing to benchmark")
+
+    rows = []
+    for level in levels:
+        for size in sizes:
+            rows.append(await run_scenario(engine, base, size, level))
+    return rows
+
+def _print_table(rows: List[Dict[str, Any]]):
+    columns = list(rows[0].keys())
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in columns}
+    typer.echo("  ".join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        typer.echo("  ".join(str(row[c]).ljust(widths[c]) for c in columns))
+
+@app.command()
+def main(
+    sizes: List[int] = typer.Option([10, 100, 1000], help="Corpus sizes (number of base vectors)"),
+    levels: List[int] = typer.Option([0, 1, 2], help="Evasion levels to benchmark"),
+    target: Optional[str] = typer.Option(None, help="Benchmark an already running target instead of spawning the mock"),
+    output: Optional[Path] = typer.Option(None, help="Write results as JSON to this file"),
+    verbose: bool = typer.Option(False, help="Keep per-request console logging (the JSON log file is always written)"),
+):
+    setup_logging(console=verbose)
+
+    proc = None
+    if target is None:
+        port = _free_port()
+        proc = _start_mock_target(port)
+        target = f"http://127.0.0.1:{port}"
+
+    try:
+        rows = asyncio.run(run_suite(sizes, levels, target))
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+    _print_table(rows)
+    if output:
+        output.write_text(json.dumps(rows, indent=4))
+        typer.echo(f"Results written to {output}")
+
+if __name__ == "__main__":
+    app()
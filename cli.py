@@ -0,0 +1,277 @@
+"""
+wbt - headless runner for CI pipelines.
+
+    python cli.py run --target http://staging:8080 --category "SQL Injection" --fail-under 90
+
+Exit codes: 0 = pass, 1 = threshold failed, 2 = error.
+"""
+import time
+import asyncio
+import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import typer
+from pydantic import ValidationError
+from core.config import settings, BenchmarkTarget, RunConfig
+from core.logger import setup_logging
+from core.orchestrator.manager import orchestrator
+from core.reporting.stream import StreamingReportWriter
+from core.distributed.worker import serve as serve_worker
+
+EXIT_PASS = 0
+EXIT_FAIL = 1
+EXIT_ERROR = 2
+
+app = typer.Typer(name="wbt", add_completion=False, help="WAF Benchmark Toolkit headless runner")
+
+@app.callback()
+def main():
+    """
+    WAF Benchmark Toolkit headless runner.
+    """
+
+class ProgressPrinter:
+    """
+    Keeps per-category counters and prints a progress line at a fixed interval.
+    """
+
+    def __init__(self, writer, interval: float):
+        self.writer = writer
+        self.interval = interval
+        self.started = time.monotonic()
+        self.last_print = self.started
+        self.total = 0
+        self.categories: Dict[str, Dict[str, int]] = {}
+        self.legit: Dict[str, Dict[str, int]] = {}
+
+    def __call__(self, result: Dict[str, Any]):
+        verdict = self.writer.detector.classify(result)
+        self.writer.write(result)
+        self.total += 1
+
+        # A/B runs keep separate counters per target
+        prefix = f"{result['target']}/" if "target" in result else ""
+        if "vector_id" in result:
+            counters = self.categories.setdefault(prefix + result.get("category", "Unknown"), {"blocked": 0, "bypass": 0, "error": 0})
+        else:
+            counters = self.legit.setdefault(prefix + "legit", {"passed": 0, "false_positive": 0, "error": 0})
+        counters[verdict] += 1
+
+        now = time.monotonic()
+        if now - self.last_print >= self.interval:
+            self.last_print = now
+            self.print()
+
+    def print(self):
+        elapsed = time.monotonic() - self.started
+        rate = self.total / elapsed if elapsed else 0.0
+        typer.echo(f"[{self.total:>8} req | {rate:8.1f} req/s | {elapsed:7.1f}s]")
+        for name, c in sorted(self.categories.items()):
+            typer.echo(f"    {name:<24} blocked={c['blocked']:<7} bypass={c['bypass']:<7} error={c['error']}")
+        for name, c in sorted(self.legit.items()):
+            typer.echo(f"    {name:<24} passed={c['passed']:<8} fp={c['false_positive']:<11} error={c['error']}")
+
+    def attack_totals(self) -> Dict[str, int]:
+        totals = {"blocked": 0, "bypass": 0, "error": 0}
+        for c in self.categories.values():
+            for k in totals:
+                totals[k] += c[k]
+        return totals
+
+def check_thresholds(stats: Dict[str, Any], fail_under: Optional[float], max_bypass_rate: Optional[float],
+                     max_fp_rate: Optional[float], label: str = "") -> List[str]:
+    """
+    Returns a list of human readable threshold violations (empty = pass).
+    `stats` is the run stats or, in A/B mode, one target's entry.
+    """
+    violations = []
+    prefix = f"{label}: " if label else ""
+    details = stats.get("details", {})
+    attack_count = details.get("detection_rate", {}).get("n", 0)
+    legit_count = details.get("false_positive_rate", {}).get("n", 0)
+
+    score = stats.get("total_score", 0)
+    if fail_under is not None and score < fail_under:
+        violations.append(f"{prefix}score {score} < {fail_under}")
+    if max_bypass_rate is not None and attack_count:
+        rate = stats.get("false_negatives", 0) / attack_count
+        if rate > max_bypass_rate:
+            violations.append(f"{prefix}bypass rate {rate:.4f} > {max_bypass_rate}")
+    if max_fp_rate is not None and legit_count:
+        rate = stats.get("false_positives", 0) / legit_count
+        if rate > max_fp_rate:
+            violations.append(f"{prefix}false positive rate {rate:.4f} > {max_fp_rate}")
+    return violations
+
+@app.command()
+def run(
+    target: Optional[str] = typer.Option(None, help="Target URL (overrides configs/target.yaml)"),
+    category: List[str] = typer.Option([], help="Only run vectors from this category (repeatable)"),
+    vector: List[str] = typer.Option([], help="Only run this vector id (repeatable)"),
+    mode: str = typer.Option("concurrent", help="'concurrent' or 'sequential'"),
+    evasion_level: Optional[int] = typer.Option(None, min=0, max=2, help="Mutation evasion level"),
+    rate: Optional[float] = typer.Option(None, min=0, help="Max attack requests/sec (0 = unlimited)"),
+    workers: Optional[int] = typer.Option(None, min=0, help="Max in-flight attack requests (0 = unbounded)"),
+    ab_target: List[str] = typer.Option([], help="A/B mode: benchmark NAME=URL too (repeatable, overrides configs/targets.yaml)"),
+    worker_agent: List[str] = typer.Option([], help="Distribute attacks to this worker agent URL (repeatable)"),
+    shard_size: Optional[int] = typer.Option(None, min=1, help="Work items per shard in coordinator mode"),
+    worker_token: Optional[str] = typer.Option(None, envvar="WBT_WORKER_TOKEN", help="Shared secret for the worker agents"),
+    sample: Optional[bool] = typer.Option(None, help="Sample the attack space and stop strata early"),
+    ci_half_width: Optional[float] = typer.Option(None, help="Stop a stratum once its bypass-rate CI half-width is below this (0-0.5]"),
+    sample_budget: Optional[int] = typer.Option(None, min=0, help="Max attack requests in sampling mode, summed over A/B targets (0 = no cap)"),
+    dedup: Optional[bool] = typer.Option(None, help="Send byte-identical requests once and reuse their verdict"),
+    resume: Optional[str] = typer.Option(None, help="Continue the checkpointed run with this id (its config is restored)"),
+    report_dir: Path = typer.Option(Path("reports"), help="Directory for streamed JSONL/JUnit reports"),
+    junit: bool = typer.Option(True, help="Write a JUnit XML report"),
+    pdf: bool = typer.Option(False, help="Also render the PDF report"),
+    profile: Optional[str] = typer.Option(None, help="Profile the run with 'cprofile' or 'pyinstrument'"),
+    fail_under: Optional[float] = typer.Option(None, help="Fail if the total score is below this value"),
+    max_bypass_rate: Optional[float] = typer.Option(None, help="Fail if bypasses / attacks exceeds this fraction"),
+    max_fp_rate: Optional[float] = typer.Option(None, help="Fail if false positives / legit requests exceeds this fraction"),
+    progress_interval: float = typer.Option(2.0, help="Seconds between progress lines"),
+    verbose: bool = typer.Option(False, help="Print per-request log lines"),
+):
+    """
+    Run a benchmark without the web stack and exit with a threshold-based code.
+    """
+    setup_logging(console=verbose)
+
+    # Overrides are applied in-memory only, configs/ is left untouched
+    if target:
+        settings.target.url = target
+    if evasion_level is not None:
+        settings.target.evasion_level = evasion_level
+    if category:
+        settings.run.categories = category
+    if vector:
+        settings.run.vector_ids = vector
+    if rate is not None:
+        settings.run.rate_limit = rate
+    if workers is not None:
+        settings.run.workers = workers
+    if ab_target:
+        targets = []
+        for spec in ab_target:
+            name, sep, url = spec.partition("=")
+            if not sep or not name or not url:
+                typer.echo(f"ERROR: --ab-target expects NAME=URL, got '{spec}'", err=True)
+                raise typer.Exit(EXIT_ERROR)
+            # Other target / WAF settings are inherited from the configs
+            targets.append(BenchmarkTarget(name=name, target=settings.target.model_copy(update={"url": url}),
+                                           waf=settings.waf.model_copy()))
+        settings.targets = targets
+    if worker_agent:
+        settings.run.worker_agents = worker_agent
+    if shard_size is not None:
+        settings.run.shard_size = shard_size
+    if worker_token is not None:
+        settings.run.worker_token = worker_token
+    if sample is not None:
+        settings.run.sampling.enabled = sample
+    if ci_half_width is not None:
+        settings.run.sampling.ci_half_width = ci_half_width
+    if sample_budget is not None:
+        settings.run.sampling.budget = sample_budget
+    if dedup is not None:
+        settings.run.dedup = dedup
+    settings.run.pdf_report = pdf
+    if profile is not None:
+        settings.run.profiler = profile
+    try:
+        # Attribute assignment skips validation, re-check the overridden run config
+        settings.run = RunConfig.model_validate(settings.run.model_dump())
+    except ValidationError as e:
+        typer.echo(f"ERROR: invalid run options: {e}", err=True)
+        raise typer.Exit(EXIT_ERROR)
+
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    writer = StreamingReportWriter(
+        json_path=report_dir / f"results_{timestamp}.jsonl",
+        junit_path=report_dir / f"junit_{timestamp}.xml" if junit else None,
+    ).open()
+    progress = ProgressPrinter(writer, progress_interval)
+
+    urls = ", ".join(f"{t.name}={t.target.url}" for t in settings.targets) or settings.target.url
+    if resume:
+        typer.echo(f"WBT: resuming run {resume}")
+    else:
+        typer.echo(f"WBT: {urls} | mode={mode} | evasion={settings.target.evasion_level}")
+    try:
+        result = asyncio.run(orchestrator.start_benchmark(mode, on_result=progress, resume=resume))
+    except KeyboardInterrupt:
+        writer.close()
+        typer.echo("Interrupted", err=True)
+        if orchestrator.run_id and settings.run.checkpoint_interval:
+            typer.echo(f"Resume with: --resume {orchestrator.run_id}", err=True)
+        raise typer.Exit(EXIT_ERROR)
+
+    stats = result.get("results", {})
+    writer.close(stats if result.get("status") == "success" else None)
+    progress.print()
+
+    if result.get("status") != "success":
+        typer.echo(f"ERROR: {result.get('message')}", err=True)
+        raise typer.Exit(EXIT_ERROR)
+
+    attacks = progress.attack_totals()
+    if attacks["error"] and not attacks["blocked"] + attacks["bypass"]:
+        typer.echo("ERROR: no attack request got a response from the target", err=True)
+        raise typer.Exit(EXIT_ERROR)
+
+    # A/B mode has no overall score, only one per target
+    for name, block in stats.get("targets", {}).items() or [("", stats)]:
+        low, high = block.get("score_ci", [None, None])
+        label = f"[{name}] " if name else ""
+        typer.echo(f"{label}Score: {block.get('total_score')}/100 (grade {block.get('grade')}, CI {low}-{high})")
+    if "sampling" in stats:
+        sampling = stats["sampling"]
+        typer.echo(f"Sampled {sampling['sent']}/{sampling['population']} attack items, {sampling['requests']} requests (seed {sampling['seed']})")
+        for name, s in sampling["strata"].items():
+            typer.echo(f"    {name:<24} n={s['sent']}/{s['population']} ({s['stopped']})")
+            # A/B mode: one estimate per target
+            for target, e in (s["targets"].items() if "targets" in s else [("", s)]):
+                label = f"[{target}] " if target else ""
+                typer.echo(f"        {label}bypass={e['bypass_rate']} CI {e['ci_low']}-{e['ci_high']}")
+    if "dedup" in stats:
+        counts = [stats["dedup"][k] for k in ("attack", "legit") if k in stats["dedup"]]
+        typer.echo(f"Dedup: {sum(c['hits'] for c in counts)} of {sum(c['hits'] + c['misses'] for c in counts)} requests "
+                   f"answered from cache (hit ratio {stats['dedup']['hit_ratio']})")
+    typer.echo(f"Reports: {writer.json_path}" + (f", {writer.junit_path}" if writer.junit_path else ""))
+    if result["reports"].get("profile"):
+        typer.echo(f"Profile: {result['reports']['profile']}")
+    typer.echo("Phases: " + ", ".join(f"{phase}={seconds:.3f}s" for phase, seconds in result.get("phases", {}).items()))
+
+    if "targets" in stats:
+        # A/B mode: every target has to meet the thresholds
+        violations = []
+        for name, target_stats in stats["targets"].items():
+            violations += check_thresholds(target_stats, fail_under, max_bypass_rate, max_fp_rate, name)
+    else:
+        violations = check_thresholds(stats, fail_under, max_bypass_rate, max_fp_rate)
+    for v in violations:
+        typer.echo(f"FAIL: {v}", err=True)
+    raise typer.Exit(EXIT_FAIL if violations else EXIT_PASS)
+
+@app.command()
+def worker(
+    host: str = typer.Option("127.0.0.1", help="Interface to listen on (only expose workers on a trusted network)"),
+    port: int = typer.Option(9101, help="Port to listen on"),
+    token: Optional[str] = typer.Option(None, envvar="WBT_WORKER_TOKEN", help="Shared secret coordinators must send (default: run.worker_token)"),
+    verbose: bool = typer.Option(False, help="Print per-request log lines"),
+):
+    """
+    Run a worker agent that executes attack shards for a coordinator.
+    """
+    setup_logging(console=verbose)
+    token = token or settings.run.worker_token
+    if not token:
+        typer.echo("ERROR: a worker agent needs a shared token (--token, WBT_WORKER_TOKEN or run.worker_token)", err=True)
+        raise typer.Exit(EXIT_ERROR)
+    typer.echo(f"WBT worker agent on {host}:{port}")
+    try:
+        asyncio.run(serve_worker(host, port, token))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    app()
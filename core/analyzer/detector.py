@@ -1,7 +1,52 @@
 from typing import List, Dict, Any, Tuple
 from core.logger import logger
+from core.telemetry.metrics import metrics
+from core.attack_engine.templates import request_id
 
 class DetectionEngine:
+    # Simple Logic: 403/406/400/50x usually means blocked
+    # 200/201/301/302 usually means passed
+    # This logic can be refined based on baselining
+    BLOCKED_CODES = frozenset([400, 403, 404, 406, 500, 502, 503]) # Depending on WAF config
+    # Neither a block nor a pass: 599 is what the mock target answers injected upstream failures with
+    ERROR_CODES = frozenset([599])
+
+    def classify(self, res: Dict[str, Any]) -> str:
+        """
+        Classifies a single result as one of:
+        'error', 'blocked' (TP), 'bypass' (FN), 'false_positive' (FP), 'passed' (TN).
+        """
+        if "error" in res or res.get("status") in self.ERROR_CODES:
+            return "error"
+        is_attack = "vector_id" in res # If it has a vector_id, it's an attack
+        is_blocked = res.get("status", 0) in self.BLOCKED_CODES
+        if is_attack:
+            return "blocked" if is_blocked else "bypass"
+        return "false_positive" if is_blocked else "passed"
+
+    def correlate(self, results: List[Dict[str, Any]], waf_logs: List[Dict[str, Any]], run_id: str) -> List[Tuple[List[str], Dict[str, Any]]]:
+        """
+        Matches WAF log entries to results via the X-WBT-Request-Id header.
+        Returns (triggered rule ids, result) pairs for entries of this run.
+        """
+        by_id = {}
+        for res in results:
+            prefix = request_id(run_id, res["target"]) if res.get("target") else run_id
+            if "vector_id" in res:
+                by_id[request_id(prefix, res["vector_id"], res.get("mutation_id"))] = res
+            elif "scenario" in res:
+                by_id[request_id(prefix, "legit", res["scenario"], res.get("user_id"))] = res
+
+        # A request may be logged more than once, merge its rules into one match
+        rules_by_id: Dict[str, Dict[str, None]] = {}
+        for entry in waf_logs:
+            rid = entry.get("wbt_request_id")
+            if rid in by_id:
+                rules = rules_by_id.setdefault(rid, {})
+                rules.update((str(r), None) for r in entry.get("rules_triggered", []) if r)
+        return [(list(rules), by_id[rid]) for rid, rules in rules_by_id.items() if rules]
+
+    @metrics.timed("analysis")
     def analyze(self, results: List[Dict[str, Any]], waf_logs: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Analyzes the traffic results to determine WAF effectiveness.
@@ -18,45 +63,32 @@ class DetectionEngine:
         logger.info("Analyzing results...")
         
         for res in results:
-            if "error" in res:
+            verdict = self.classify(res)
+            if verdict == "error":
                 continue
-                
-            status = res.get("status", 0)
-            is_attack = "vector_id" in res # If it has a vector_id, it's an attack
-            
-            # Simple Logic: 403/406/400/50x usually means blocked
-            # 200/201/301/302 usually means passed
-            # This logic can be refined based on baselining
-            
-            blocked_codes = [400, 403, 404, 406, 500, 502, 503] # Depending on WAF config
-            
-            # Check if block
-            is_blocked = status in blocked_codes
-            
-            if is_attack:
-                if is_blocked:
-                    blocked_requests += 1 # True Positive
-                else:
-                    passed_requests += 1 # False Negative (Bypass)
-                    false_negatives += 1
-                    bypasses.append({
-                        "vector_id": res.get("vector_id"),
-                        "category": res.get("category"),
-                        "payload": res.get("payload"),
-                        "status": status,
-                        "mutation_id": res.get("mutation_id")
-                    })
-            else:
+
+            if verdict == "blocked":
+                blocked_requests += 1 # True Positive
+            elif verdict == "bypass":
+                passed_requests += 1 # False Negative (Bypass)
+                false_negatives += 1
+                bypasses.append({
+                    "vector_id": res.get("vector_id"),
+                    "category": res.get("category"),
+                    "payload": res.get("payload"),
+                    "status": res.get("status", 0),
+                    "mutation_id": res.get("mutation_id")
+                })
+            elif verdict == "false_positive":
                 # Legit Traffic
-                if is_blocked:
-                    blocked_requests += 1 # False Positive
-                    false_positives += 1
-                    failures.append({
-                        "scenario": res.get("scenario"),
-                        "status": status
-                    })
-                else:
-                    passed_requests += 1 # True Negative
+                blocked_requests += 1 # False Positive
+                false_positives += 1
+                failures.append({
+                    "scenario": res.get("scenario"),
+                    "status": res.get("status", 0)
+                })
+            else:
+                passed_requests += 1 # True Negative
                     
         return {
             "total_requests": total_requests,
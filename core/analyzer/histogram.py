@@ -0,0 +1,65 @@
+import bisect
+from typing import Any, Dict, List, Optional
+
+# Bucket upper bounds in milliseconds (last bucket is +Inf)
+DEFAULT_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000]
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram. Histograms with the same bounds can be
+    merged exactly, so partial results from several workers add up.
+    """
+
+    def __init__(self, bounds: Optional[List[float]] = None):
+        self.bounds = list(bounds or DEFAULT_BOUNDS_MS)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def add(self, value_ms: float):
+        self.counts[bisect.bisect_left(self.bounds, value_ms)] += 1
+        self.count += 1
+        self.sum += value_ms
+
+    def merge(self, other: "LatencyHistogram"):
+        if other.bounds != self.bounds:
+            raise ValueError("Cannot merge histograms with different bucket bounds")
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.count += other.count
+        self.sum += other.sum
+
+    def quantile(self, q: float) -> float:
+        """
+        Returns the upper bound of the bucket containing the q-th quantile.
+        Values beyond the last bound are reported as the last bound.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                break
+        return float(self.bounds[min(i, len(self.bounds) - 1)])
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": round(self.sum / self.count, 3) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"bounds": self.bounds, "counts": self.counts, "count": self.count, "sum": self.sum}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        hist = cls(data["bounds"])
+        hist.counts = list(data["counts"])
+        hist.count = data["count"]
+        hist.sum = data["sum"]
+        return hist
@@ -0,0 +1,84 @@
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+from core.attack_engine.templates import REQUEST_ID_HEADER
+
+# Per-request bookkeeping headers, not part of what the WAF is judging
+IGNORED_HEADERS = frozenset([REQUEST_ID_HEADER.lower(), "x-wbt-user"])
+
+def request_digest(method: str, url: Any, headers: Iterable[Tuple[str, str]], body: Optional[bytes]) -> bytes:
+    """
+    Digest of the canonical wire request: method, URL, headers (names
+    lower-cased, sorted, WBT bookkeeping headers dropped) and body.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(method.upper().encode())
+    h.update(b"\0")
+    h.update(str(url).encode())
+    for name, value in sorted((k.lower(), v) for k, v in headers if k.lower() not in IGNORED_HEADERS):
+        h.update(b"\0")
+        h.update(name.encode())
+        h.update(b":")
+        h.update(value.encode())
+    h.update(b"\0\0")
+    h.update(body or b"")
+    return h.digest()
+
+class VerdictCache:
+    """
+    Bounded LRU of responses to already-sent requests, keyed by request
+    digest. A request identical to one still in flight waits for it instead
+    of going on the wire a second time.
+
+        verdict = await cache.get(key)
+        if verdict is None:
+            try: ... send, verdict = {...}
+            finally: cache.put(key, verdict)  # always, None on failure
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        self._inflight: Dict[bytes, asyncio.Future] = {}
+
+    async def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """
+        Cached verdict for `key`, or None if the caller has to send it.
+        """
+        while True:
+            verdict = self._cache.get(key)
+            if verdict is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return verdict
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            # Woken with no cached verdict (sender failed / evicted) => loop and send ourselves.
+            # Shielded: a cancelled waiter must not cancel the future the other waiters share
+            await asyncio.shield(future)
+        self._inflight[key] = asyncio.get_running_loop().create_future()
+        self.misses += 1
+        return None
+
+    def put(self, key: bytes, verdict: Optional[Dict[str, Any]]):
+        if verdict is not None:
+            self._cache[key] = verdict
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        future = self._inflight.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(None)
+
+    def summary(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "cached": len(self._cache),
+        }
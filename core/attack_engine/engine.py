@@ -1,20 +1,67 @@
 import yaml
 import aiohttp
 import asyncio
+import time
+import uuid
+import contextlib
+from yarl import URL
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Callable, Optional, Set, Tuple
 from core.logger import logger
-from core.config import settings
+from core.config import settings, TargetConfig
 from core.attack_engine.mutator import PayloadMutator
+from core.attack_engine.ratelimit import RateLimiter
+from core.attack_engine.templates import TemplateCache, HeaderPairs, request_id, work_key, result_key
+from core.attack_engine.dedup import VerdictCache, request_digest
+from core.attack_engine.sampler import StratifiedSampler
+from core.analyzer.detector import DetectionEngine
+from core.analyzer.histogram import LatencyHistogram
+from core.telemetry.metrics import metrics
 
 PAYLOAD_DIR = Path(__file__).parent.parent.parent / "payloads"
 
+# (vector, mutated payload, mutation_id, mutation family)
+WorkItem = Tuple[Dict[str, Any], str, int, str]
+# (method, url, headers, body) as built from a request template
+Request = Tuple[str, URL, HeaderPairs, Optional[bytes]]
+
+class RunContext:
+    """
+    Per-run state shared by every in-flight request: session, pacing and the
+    compiled request templates. Target settings are read once, here. In A/B
+    mode there is one context per named target.
+    """
+
+    __slots__ = ("run_id", "name", "id_prefix", "session", "limiter", "semaphore", "templates", "timeout", "latency", "dedup")
+
+    def __init__(self, run_id: str, session: aiohttp.ClientSession, target: TargetConfig, rate_limit: float = 0.0, workers: int = 0,
+                 name: Optional[str] = None, dedup: Optional[VerdictCache] = None):
+        self.run_id = run_id
+        self.name = name
+        # Request ids are scoped per target so shared WAF logs can't cross-match
+        self.id_prefix = request_id(run_id, name) if name else run_id
+        self.session = session
+        self.limiter = RateLimiter(rate_limit)
+        self.semaphore = asyncio.Semaphore(workers) if workers else None
+        self.templates = TemplateCache(target)
+        self.timeout = aiohttp.ClientTimeout(total=target.timeout)
+        self.latency = LatencyHistogram()
+        self.dedup = dedup
+
 class AttackEngine:
     def __init__(self):
+        start = time.perf_counter()
         self.payloads = self._load_payloads()
+        # Loaded once per process, carried into every run's phase summary
+        self.load_seconds = time.perf_counter() - start
         self.mutator = PayloadMutator()
         self.results: List[Dict[str, Any]] = []
+        self.latency = LatencyHistogram()
+        self.sampling: Optional[Dict[str, Any]] = None # Summary of the last sampled run
+        self.target_latency: Dict[str, LatencyHistogram] = {} # A/B mode, per target name
+        self.dedup: Optional[VerdictCache] = None # Verdict cache of the last run, if dedup is on
 
+    @metrics.timed("payload_load")
     def _load_payloads(self) -> List[Dict[str, Any]]:
         loaded = []
         if not PAYLOAD_DIR.exists():
@@ -33,77 +80,254 @@ class AttackEngine:
                 logger.error(f"Failed to load payload file {f}: {e}")
         return loaded
 
-    async def run(self) -> List[Dict[str, Any]]:
+    def select_vectors(self) -> List[Dict[str, Any]]:
+        """
+        Applies the configured corpus subset (categories / vector ids).
+        """
+        categories = {c.lower() for c in settings.run.categories}
+        vector_ids = set(settings.run.vector_ids)
+        return [
+            v for v in self.payloads
+            if (not categories or v["category"].lower() in categories)
+            and (not vector_ids or v["id"] in vector_ids)
+        ]
+
+    @metrics.timed("mutation")
+    def expand(self, vectors: List[Dict[str, Any]]) -> List[WorkItem]:
+        """
+        Expands vectors into the full vector x mutation workload.
+        """
         evasion_level = settings.target.evasion_level
-        logger.info(f"Starting Attack Engine with {len(self.payloads)} base vectors | Evasion Level: {evasion_level}")
-        
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-            for vector in self.payloads:
-                # Generate mutations based on configured evasion level
-                mutations = self.mutator.mutate(vector["payload"], level=evasion_level)
-                logger.info(f"Vector {vector['id']}: Generated {len(mutations)} mutations (Base: {vector['payload'][:20]}...)")
-                
-                for i, mutant in enumerate(mutations):
-                    tasks.append(self._send_attack(session, vector, mutant, i))
+        items: List[WorkItem] = []
+        for vector in vectors:
+            # Generate mutations based on configured evasion level
+            mutations = self.mutator.mutate_labeled(vector["payload"], level=evasion_level)
+            logger.info(f"Vector {vector['id']}: Generated {len(mutations)} mutations (Base: {vector['payload'][:20]}...)")
             
-            # Concurrency control could be added here (Semaphore)
-            self.results = await asyncio.gather(*tasks)
+            for i, (family, mutant) in enumerate(mutations):
+                items.append((vector, mutant, i, family))
+        return items
+
+    async def run(self, on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                  run_id: Optional[str] = None,
+                  completed: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        Runs the configured corpus. `completed` holds results of a checkpointed
+        earlier attempt of the same run, their items are not sent again.
+        """
+        vectors = self.select_vectors()
+        logger.info(f"Starting Attack Engine with {len(vectors)} base vectors | Evasion Level: {settings.target.evasion_level}")
+
+        self.latency = LatencyHistogram()
+        self.sampling = None
+        self.target_latency = {}
+        completed = [r for r in completed or [] if "vector_id" in r]
+        done = {result_key(r) for r in completed}
+        items = self.expand(vectors)
+        if settings.run.sampling.enabled:
+            self.results = await self.run_sampled(items, settings.run.rate_limit, settings.run.workers, on_result, run_id,
+                                                  done, completed)
+        else:
+            self.results = await self.run_items(items, settings.run.rate_limit, settings.run.workers, on_result, run_id, done)
+
+        # Latency stats cover the whole run, including the resumed part
+        for r in completed:
+            if "latency" in r:
+                self.latency.add(r["latency"])
+                if r.get("target") in self.target_latency:
+                    self.target_latency[r["target"]].add(r["latency"])
             
         logger.info(f"Attack Engine finished. Total requests: {len(self.results)}")
         return self.results
 
-    async def _send_attack(self, session: aiohttp.ClientSession, vector: Dict, payload: str, mutation_id: int) -> Dict[str, Any]:
+    def pending(self, items: List[WorkItem], done: Set[str], target: Optional[str] = None) -> List[WorkItem]:
         """
-        Sends a single attack request.
+        Items not yet completed for `target`.
+        """
+        if not done:
+            return items
+        return [item for item in items if work_key(target, item[0]["id"], item[2]) not in done]
+
+    def open_run(self, session: aiohttp.ClientSession, rate_limit: float = 0.0, workers: int = 0,
+                 run_id: Optional[str] = None, dedup: Optional[VerdictCache] = None) -> RunContext:
         """
-        url = settings.target.url
-        method = vector.get("method", "GET")
-        location = vector.get("location", "query")
-        
-        # Prepare params/body
-        params = {}
-        data = None
-        headers = settings.target.headers.copy() # Start with global custom headers
-        
-        # Dynamically inject payload
-        if location == "query":
-            params = {"q": payload}
-        elif location == "header":
-            headers["X-Attack-Payload"] = payload
-        elif location == "body":
-            data = {"input": payload}
-        elif location == "path":
-            if url.endswith("/"):
-                url += payload
+        Snapshots the target settings and compiles request templates for one run.
+        """
+        return RunContext(run_id or uuid.uuid4().hex[:12], session, settings.target, rate_limit, workers, dedup=dedup)
+
+    @contextlib.asynccontextmanager
+    async def open_runs(self, rate_limit: float = 0.0, workers: int = 0, run_id: Optional[str] = None,
+                        sampled: bool = False) -> AsyncIterator[List[RunContext]]:
+        """
+        One context per benchmark target (settings.targets), each with its own
+        session / connection pool and pacing. Falls back to the single target.
+        """
+        run_id = run_id or uuid.uuid4().hex[:12]
+        # One cache for all targets, target URLs differ so their entries never collide
+        self.dedup = VerdictCache(settings.run.dedup_cache_size) if settings.run.dedup else None
+        async with contextlib.AsyncExitStack() as stack:
+            if not settings.targets:
+                session = await stack.enter_async_context(aiohttp.ClientSession())
+                ctxs = [self.open_run(session, rate_limit, 0 if sampled else workers, run_id, self.dedup)]
             else:
-                url += "/" + payload
+                ctxs = []
+                for spec in settings.targets:
+                    session = await stack.enter_async_context(aiohttp.ClientSession())
+                    # In sampling mode the puller pool bounds concurrency instead
+                    ctx_workers = 0 if sampled else spec.workers or workers
+                    ctxs.append(RunContext(run_id, session, spec.target, spec.rate_limit or rate_limit, ctx_workers, spec.name,
+                                           self.dedup))
+            try:
+                yield ctxs
+            finally:
+                for ctx in ctxs:
+                    if ctx.name:
+                        self.target_latency[ctx.name] = ctx.latency
+
+    @metrics.timed("dispatch")
+    async def run_items(self, items: List[WorkItem], rate_limit: float = 0.0, workers: int = 0,
+                        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                        run_id: Optional[str] = None, done: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Sends the given work items, paced to `rate_limit` req/s with at most `workers` in flight.
+        Each item is fanned out to every target, skipping work keys in `done`.
+        """
+        async with self.open_runs(rate_limit, workers, run_id) as ctxs:
+            tasks = [self.dispatch(ctx, item, on_result) for item in items for ctx in ctxs
+                     if not done or work_key(ctx.name, item[0]["id"], item[2]) not in done]
+            # Concurrency is bounded by the context semaphores (if configured)
+            return await asyncio.gather(*tasks)
+
+    @metrics.timed("dispatch")
+    async def run_sampled(self, items: List[WorkItem], rate_limit: float = 0.0, workers: int = 0,
+                          on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                          run_id: Optional[str] = None, done: Optional[Set[str]] = None,
+                          completed: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        Sends a stratified random sample of the items, stopping each stratum
+        early once its bypass-rate estimate is tight enough.
+        """
+        sampler = StratifiedSampler(items, settings.run.sampling, settings.scoring.confidence,
+                                    [t.name for t in settings.targets])
+        detector = DetectionEngine()
+        results: List[Dict[str, Any]] = []
+        done = done or set()
+        if completed:
+            names = [t.name for t in settings.targets] or [None]
+            finished = {(item[0]["id"], item[2]) for item in items
+                        if all(work_key(name, item[0]["id"], item[2]) in done for name in names)}
+            sampler.restore(completed, detector.classify, finished)
+        logger.info(f"Sampling {len(sampler.strata)} strata from {len(items)} items (seed {sampler.seed})")
+
+        async def pull(ctxs: List[RunContext]):
+            # Items are drawn lazily so stopped strata stop consuming requests
+            while (item := sampler.draw()) is not None:
+                todo = [ctx for ctx in ctxs if work_key(ctx.name, item[0]["id"], item[2]) not in done]
+                for ctx, result in zip(todo, await asyncio.gather(*(self.dispatch(ctx, item, on_result) for ctx in todo))):
+                    sampler.record(item, detector.classify(result), ctx.name)
+                    results.append(result)
+
+        async with self.open_runs(rate_limit, workers, run_id, sampled=True) as ctxs:
+            # A fixed pool of pullers replaces the semaphore as the concurrency bound
+            await asyncio.gather(*(pull(ctxs) for _ in range(workers or settings.target.concurrency)))
+
+        self.sampling = sampler.summary()
+        logger.info(f"Sampling finished: {sampler.drawn}/{len(items)} items sent")
+        return results
+
+    async def dispatch(self, ctx: RunContext, item: WorkItem,
+                       on_result: Optional[Callable[[Dict[str, Any]], None]]) -> Dict[str, Any]:
+        """
+        Sends one work item through an open run context and reports its result.
+        """
+        if ctx.dedup is None:
+            result = await self._send_paced(ctx, item)
+        else:
+            result = await self._send_deduped(ctx, item)
+        if ctx.name:
+            result["target"] = ctx.name
+        if not result.get("cached"):
+            metrics.inc("wbt_requests_total", kind="attack", status=result.get("status", "error"))
+        if "latency" in result:
+            self.latency.add(result["latency"])
+            ctx.latency.add(result["latency"])
+        if on_result:
+            on_result(result)
+        return result
+
+    async def _send_paced(self, ctx: RunContext, item: WorkItem, request: Optional[Request] = None) -> Dict[str, Any]:
+        async with ctx.semaphore or contextlib.nullcontext():
+            await ctx.limiter.acquire()
+            metrics.add("wbt_requests_in_flight", 1, kind="attack")
+            try:
+                return await self._send_attack(ctx, item, request or self._build(ctx, item))
+            finally:
+                metrics.add("wbt_requests_in_flight", -1, kind="attack")
+
+    async def _send_deduped(self, ctx: RunContext, item: WorkItem) -> Dict[str, Any]:
+        """
+        Answers byte-identical requests from the verdict cache, only the first goes on the wire.
+        """
+        request = self._build(ctx, item)
+        key = request_digest(*request)
+        verdict = await ctx.dedup.get(key)
+        if verdict is not None:
+            metrics.inc("wbt_dedup_hits_total", kind="attack")
+            return self._attack_result(item, **verdict, cached=True)
+
+        verdict = None
+        try:
+            result = await self._send_paced(ctx, item, request)
+            if "error" not in result:
+                verdict = {"status": result["status"], "response_len": result["response_len"]}
+            return result
+        finally:
+            ctx.dedup.put(key, verdict)
+
+    def _build(self, ctx: RunContext, item: WorkItem) -> Request:
+        vector, payload, mutation_id, _ = item
+        template = ctx.templates.get(vector.get("method", "GET"), vector.get("location", "query"))
+        return (template.method, *template.build(payload, request_id(ctx.id_prefix, vector["id"], mutation_id)))
+
+    def _attack_result(self, item: WorkItem, **fields) -> Dict[str, Any]:
+        vector, payload, mutation_id, family = item
+        return {
+            "vector_id": vector["id"],
+            "mutation_id": mutation_id,
+            "mutation_family": family,
+            "category": vector["category"],
+            "payload": payload,
+            **fields
+        }
+
+    async def _send_attack(self, ctx: RunContext, item: WorkItem, request: Request) -> Dict[str, Any]:
+        """
+        Sends a single attack request.
+        """
+        vector, payload, mutation_id, family = item
+        method, url, headers, body = request
                 
         try:
-            async with session.request(
+            start_time = asyncio.get_running_loop().time()
+            async with ctx.session.request(
                 method, 
                 url, 
-                params=params, 
-                json=data, 
+                data=body, 
                 headers=headers, 
-                timeout=settings.target.timeout
+                timeout=ctx.timeout
             ) as response:
                 status = response.status
-                text = await response.text()
+                body_bytes = await response.read()
+                latency = (asyncio.get_running_loop().time() - start_time) * 1000
+                metrics.record_phase("network_wait", latency / 1000)
                 
                 result_type = "BLOCKED" if status in [403, 406, 500] else "PASSED"
                 log_level = logger.warning if result_type == "PASSED" else logger.info
                 
-                log_level(f"Attack {vector['id']} [Mut:{mutation_id}] => Status: {status} ({result_type})")
+                with metrics.span("logging"):
+                    log_level(f"Attack {vector['id']} [Mut:{mutation_id}] => Status: {status} ({result_type})")
                 
-                return {
-                    "vector_id": vector["id"],
-                    "mutation_id": mutation_id,
-                    "category": vector["category"],
-                    "payload": payload,
-                    "status": status,
-                    "response_len": len(text)
-                }
+                return self._attack_result(item, status=status, response_len=len(body_bytes), latency=latency)
         except Exception as e:
             logger.error(f"Attack failed {vector['id']}: {e}")
-            return {"vector_id": vector["id"], "error": str(e)}
+            return {"vector_id": vector["id"], "mutation_id": mutation_id, "mutation_family": family, "category": vector["category"], "error": str(e)}
@@ -1,15 +1,15 @@
 import urllib.parse
-from typing import List, Set
+from typing import Dict, List, Tuple
 import random
 
 class PayloadMutator:
     """
     Applies obfuscation and encoding to payloads to test WAF normalization.
     """
-    
+
     # Common WAF bypass whitespace characters
     WHITESPACES = ["/**/", "%09", "%0a", "%0c", "%0d", "+"]
-    
+
     def mutate(self, payload: str, level: int = 0) -> List[str]:
         """
         Returns a list of mutated variations of the payload based on evasion level.
@@ -17,41 +17,56 @@ class PayloadMutator:
         Level 1: Basic (URL Encode, Case)
         Level 2: Advanced (Double Encode, Comments, Whitespace)
         """
-        mutations: Set[str] = {payload}
-        
+        return [mutant for _, mutant in self.mutate_labeled(payload, level)]
+
+    def mutate_labeled(self, payload: str, level: int = 0) -> List[Tuple[str, str]]:
+        """
+        Same as mutate() but returns (family, mutant) pairs. Order is stable
+        across runs and duplicates keep the first family that produced them.
+        """
+        mutations: Dict[str, str] = {payload: "original"}
+
+        def add(family: str, mutant: str):
+            mutations.setdefault(mutant, family)
+
         if level <= 0:
-            return list(mutations)
-            
+            return self._pairs(mutations)
+
         # --- Level 1: Basic Evasion ---
         # 1. URL Encoding
-        mutations.add(urllib.parse.quote(payload))
-        
+        add("url_encode", urllib.parse.quote(payload))
+
         # 2. Case Switching (e.g. <sCrIpT>)
-        mutations.add(self._random_case(payload))
-        mutations.add(payload.upper())
-        mutations.add(payload.lower())
-        
+        add("random_case", self._random_case(payload))
+        add("upper_case", payload.upper())
+        add("lower_case", payload.lower())
+
         # 3. SQLi Comment Replacement (Simple)
         if " " in payload:
-            mutations.add(payload.replace(" ", "/**/"))
+            add("comment_space", payload.replace(" ", "/**/"))
 
         if level < 2:
-            return list(mutations)
+            return self._pairs(mutations)
 
         # --- Level 2: Advanced Evasion ---
         # 4. Double URL Encoding
-        mutations.add(urllib.parse.quote(urllib.parse.quote(payload)))
-        
+        add("double_url_encode", urllib.parse.quote(urllib.parse.quote(payload)))
+
         # 5. Unicode / Overlong (Simulated for now via standard parse)
         # 6. Advanced Whitespace Injection
         if " " in payload:
             for ws in self.WHITESPACES:
-                mutations.add(payload.replace(" ", ws))
-                
+                add("whitespace", payload.replace(" ", ws))
+
         # 7. Null Byte Injection (Dangerous but valid test)
-        mutations.add(payload + "%00")
-        
-        return list(mutations)
+        add("null_byte", payload + "%00")
+
+        return self._pairs(mutations)
+
+    def _pairs(self, mutations: Dict[str, str]) -> List[Tuple[str, str]]:
+        return [(family, mutant) for mutant, family in mutations.items()]
 
     def _random_case(self, s: str) -> str:
-        return "".join(c.upper() if random.choice([True, False]) else c.lower() for c in s)
+        # Seeded by the payload so mutation ids are reproducible between runs
+        rng = random.Random(s)
+        return "".join(c.upper() if rng.choice([True, False]) else c.lower() for c in s)
@@ -0,0 +1,20 @@
+import asyncio
+
+class RateLimiter:
+    """
+    Paces callers to a fixed requests/sec budget. A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
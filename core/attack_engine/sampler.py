@@ -0,0 +1,181 @@
+import random
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from core.config import SamplingConfig
+from core.logger import logger
+from core.scoring.aggregator import wilson_interval
+
+# Stop reasons reported per stratum
+CONVERGED = "converged"
+EXHAUSTED = "exhausted"
+STRATUM_CAP = "max_samples"
+BUDGET = "budget"
+
+class Estimate:
+    """
+    Bypass-rate counters of one stratum against one target.
+    """
+    __slots__ = ("blocked", "bypass", "errors")
+
+    def __init__(self):
+        self.blocked = 0
+        self.bypass = 0
+        self.errors = 0
+
+    @property
+    def n(self) -> int:
+        return self.blocked + self.bypass
+
+class Stratum:
+    __slots__ = ("key", "items", "drawn", "estimates", "stopped")
+
+    def __init__(self, key: str, items: List[Any], targets: List[Optional[str]]):
+        self.key = key
+        self.items = items # Shuffled, drawn from the end
+        self.drawn = 0
+        self.estimates = {target: Estimate() for target in targets}
+        self.stopped: Optional[str] = None
+
+class StratifiedSampler:
+    """
+    Draws work items in random order, round-robin across strata, and stops
+    each stratum once the Wilson interval of its bypass rate is narrower than
+    `ci_half_width` (after `min_samples`), it hits `max_samples` or the global
+    `budget` is spent. Items are (vector, payload, mutation_id, family) tuples.
+    In A/B mode each drawn item is sent to every target and counted per
+    target; a stratum only converges once every target's interval is tight.
+    """
+
+    def __init__(self, items: List[Any], config: SamplingConfig, confidence: float = 0.95,
+                 targets: Optional[List[str]] = None):
+        self.config = config
+        self.confidence = confidence
+        self.targets: List[Optional[str]] = list(targets) if targets else [None]
+        self.seed = config.seed if config.seed is not None else random.randrange(2 ** 32)
+        rng = random.Random(self.seed)
+
+        groups: Dict[str, List[Any]] = {}
+        for item in items:
+            groups.setdefault(self.stratum_key(item), []).append(item)
+        self.population = len(items)
+        self.strata: Dict[str, Stratum] = {}
+        for key in sorted(groups):
+            rng.shuffle(groups[key])
+            self.strata[key] = Stratum(key, groups[key], self.targets)
+        self._order = list(self.strata.values())
+        self._cursor = 0
+        self.drawn = 0
+
+    def stratum_key(self, item: Any) -> str:
+        return self._key(item[0]["category"], item[0]["id"])
+
+    def _key(self, category: str, vector_id: str) -> str:
+        if self.config.stratify_by == "vector":
+            return f"{category}/{vector_id}"
+        return category
+
+    def draw(self) -> Optional[Any]:
+        """
+        Next item to send, or None once every stratum has stopped.
+        """
+        # Caps count requests, each drawn item is one request per target
+        fanout = len(self.targets)
+        if self.config.budget and (self.drawn + 1) * fanout > self.config.budget:
+            self._stop_all(BUDGET)
+            return None
+        for _ in range(len(self._order)):
+            stratum = self._order[self._cursor]
+            self._cursor = (self._cursor + 1) % len(self._order)
+            if stratum.stopped:
+                continue
+            if not stratum.items:
+                self._stop(stratum, EXHAUSTED)
+                continue
+            if self.config.max_samples and (stratum.drawn + 1) * fanout > self.config.max_samples:
+                self._stop(stratum, STRATUM_CAP)
+                continue
+            stratum.drawn += 1
+            self.drawn += 1
+            return stratum.items.pop()
+        return None
+
+    def restore(self, results: List[Dict[str, Any]], classify: Callable[[Dict[str, Any]], str],
+                finished: Set[Tuple[str, int]]):
+        """
+        Counts attack results completed before a resume towards their strata
+        and removes the `finished` (vector id, mutation id) items from the draw.
+        """
+        for result in results:
+            stratum = self.strata.get(self._key(result.get("category"), result.get("vector_id")))
+            if stratum is not None:
+                self._count(stratum, result.get("target"), classify(result))
+        for stratum in self._order:
+            remaining = [item for item in stratum.items if (item[0]["id"], item[2]) not in finished]
+            stratum.drawn += len(stratum.items) - len(remaining)
+            self.drawn += len(stratum.items) - len(remaining)
+            stratum.items = remaining
+
+    def record(self, item: Any, verdict: str, target: Optional[str] = None):
+        self._count(self.strata[self.stratum_key(item)], target, verdict)
+
+    def _count(self, stratum: Stratum, target: Optional[str], verdict: str):
+        estimate = stratum.estimates.get(target)
+        if estimate is None:
+            return
+        if verdict == "blocked":
+            estimate.blocked += 1
+        elif verdict == "bypass":
+            estimate.bypass += 1
+        else:
+            estimate.errors += 1
+        if not stratum.stopped and all(self._converged(e) for e in stratum.estimates.values()):
+            self._stop(stratum, CONVERGED)
+
+    def _converged(self, estimate: Estimate) -> bool:
+        if estimate.n < self.config.min_samples:
+            return False
+        low, high = wilson_interval(estimate.bypass, estimate.n, self.confidence)
+        return (high - low) / 2 <= self.config.ci_half_width
+
+    def _stop(self, stratum: Stratum, reason: str):
+        stratum.stopped = reason
+        logger.info(f"Sampling: stratum '{stratum.key}' stopped ({reason}) after {stratum.drawn} requests")
+
+    def _stop_all(self, reason: str):
+        for stratum in self._order:
+            if not stratum.stopped:
+                self._stop(stratum, reason)
+
+    def _estimate(self, e: Estimate) -> Dict[str, Any]:
+        low, high = wilson_interval(e.bypass, e.n, self.confidence)
+        return {
+            "bypass": e.bypass,
+            "blocked": e.blocked,
+            "errors": e.errors,
+            "bypass_rate": round(e.bypass / e.n, 4) if e.n else None,
+            "ci_low": round(low, 4),
+            "ci_high": round(high, 4),
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Per stratum: items drawn and why it stopped, with the bypass-rate
+        estimate inline (single target) or under `targets` (A/B mode).
+        """
+        strata = {}
+        for key, s in self.strata.items():
+            strata[key] = {
+                "population": s.drawn + len(s.items),
+                "sent": s.drawn,
+                "stopped": s.stopped,
+            }
+            if self.targets == [None]:
+                strata[key].update(self._estimate(s.estimates[None]))
+            else:
+                strata[key]["targets"] = {name: self._estimate(e) for name, e in s.estimates.items()}
+        return {
+            "seed": self.seed,
+            "population": self.population,
+            "sent": self.drawn,
+            "requests": self.drawn * len(self.targets),
+            "strata": strata,
+        }
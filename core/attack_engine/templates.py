@@ -0,0 +1,144 @@
+import json
+import urllib.parse
+from typing import Any, Dict, Optional, Tuple
+from multidict import CIMultiDict
+from yarl import URL
+from core.config import TargetConfig
+from core.logger import logger
+
+# Injection locations a vector can declare
+LOCATIONS = ("query", "header", "cookie", "body", "form", "multipart", "path")
+
+PARAM_NAME = "input"
+QUERY_PARAM = "q"
+ATTACK_HEADER = "X-Attack-Payload"
+REQUEST_ID_HEADER = "X-WBT-Request-Id" # Lets WAF audit log entries be correlated to results
+MULTIPART_BOUNDARY = "----WBTFormBoundary7MA4YWxkTrZu0gW"
+
+# Same characters yarl leaves unescaped in query values / paths
+QUERY_SAFE = "!$'()*,/:?@"
+PATH_SAFE = "%!$&'()*+,/:;=@"
+
+# aiohttp accepts any iterable of pairs, a tuple is the cheapest to extend per request
+HeaderPairs = Tuple[Tuple[str, str], ...]
+
+def request_id(run_id: str, *parts: object) -> str:
+    return "/".join([run_id, *map(str, parts)])
+
+def work_key(target: Optional[str], *parts: object) -> str:
+    """
+    Run-independent id of a work item, e.g. 'sqli-001:3' or 'b/legit:Homepage:0'.
+    """
+    key = ":".join(map(str, parts))
+    return f"{target}/{key}" if target else key
+
+def result_key(result: Dict[str, Any]) -> Optional[str]:
+    """
+    work_key() of the item a result came from.
+    """
+    if "vector_id" in result:
+        return work_key(result.get("target"), result["vector_id"], result.get("mutation_id"))
+    if "scenario" in result:
+        return work_key(result.get("target"), "legit", result["scenario"], result.get("user_id"))
+    return None
+
+class RequestTemplate:
+    """
+    Immutable, pre-encoded request shape for one (method, location) pair.
+    Everything that does not depend on the payload (URL prefix, headers,
+    body framing) is encoded once; build() only splices the payload in.
+    """
+
+    __slots__ = ("method", "location", "_url", "_url_prefix", "_headers", "_header_name", "_header_prefix",
+                 "_body_prefix", "_body_suffix")
+
+    def __init__(self, method: str, location: str, target: TargetConfig):
+        if location not in LOCATIONS:
+            logger.warning(f"Unknown injection location '{location}', falling back to query")
+            location = "query"
+
+        self.method = method
+        self.location = location
+        self._header_name: Optional[str] = None
+        self._header_prefix = ""
+        self._body_prefix = b""
+        self._body_suffix = b""
+
+        base_url = target.url
+        headers = CIMultiDict(target.headers) # Start with global custom headers
+
+        if location == "query":
+            sep = "&" if "?" in base_url else "?"
+            self._url_prefix = f"{base_url}{sep}{QUERY_PARAM}="
+        elif location == "path":
+            self._url_prefix = base_url if base_url.endswith("/") else base_url + "/"
+        else:
+            self._url_prefix = base_url
+        # Locations that don't touch the URL share one parsed instance
+        self._url = None if location in ("query", "path") else URL(base_url)
+
+        if location == "header":
+            self._header_name = ATTACK_HEADER
+        elif location == "cookie":
+            self._header_name = "Cookie"
+            existing = headers.popone("Cookie", "")
+            self._header_prefix = f"{existing}; {PARAM_NAME}=" if existing else f"{PARAM_NAME}="
+        elif location == "body":
+            headers["Content-Type"] = "application/json"
+            self._body_prefix = b'{"' + PARAM_NAME.encode() + b'": '
+            self._body_suffix = b"}"
+        elif location == "form":
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+            self._body_prefix = PARAM_NAME.encode() + b"="
+        elif location == "multipart":
+            headers["Content-Type"] = f"multipart/form-data; boundary={MULTIPART_BOUNDARY}"
+            self._body_prefix = (
+                f"--{MULTIPART_BOUNDARY}\r\n"
+                f"Content-Disposition: form-data; name=\"{PARAM_NAME}\"\r\n\r\n"
+            ).encode()
+            self._body_suffix = f"\r\n--{MULTIPART_BOUNDARY}--\r\n".encode()
+
+        self._headers: HeaderPairs = tuple(headers.items())
+
+    def build(self, payload: str, req_id: str) -> Tuple[URL, HeaderPairs, Optional[bytes]]:
+        """
+        Returns (url, headers, body) for the given payload.
+        """
+        location = self.location
+        headers = self._headers + ((REQUEST_ID_HEADER, req_id),)
+        body = None
+
+        if location == "query":
+            url = URL(self._url_prefix + urllib.parse.quote_plus(payload, safe=QUERY_SAFE), encoded=True)
+        elif location == "path":
+            url = URL(self._url_prefix + urllib.parse.quote(payload, safe=PATH_SAFE), encoded=True)
+        else:
+            url = self._url
+
+        if self._header_name:
+            value = payload if location == "header" else self._header_prefix + urllib.parse.quote(payload, safe="")
+            headers += ((self._header_name, value),)
+        elif location == "body":
+            body = self._body_prefix + json.dumps(payload).encode() + self._body_suffix
+        elif location == "form":
+            body = self._body_prefix + urllib.parse.quote_plus(payload).encode()
+        elif location == "multipart":
+            body = self._body_prefix + payload.encode() + self._body_suffix
+
+        return url, headers, body
+
+class TemplateCache:
+    """
+    Per-run set of compiled templates for one target.
+    """
+
+    def __init__(self, target: TargetConfig):
+        self.target = target
+        self._templates: Dict[Tuple[str, str], RequestTemplate] = {}
+
+    def get(self, method: str, location: str) -> RequestTemplate:
+        key = (method, location)
+        template = self._templates.get(key)
+        if template is None:
+            template = self._templates[key] = RequestTemplate(method, location, self.target)
+        return template
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 import yaml
 from pydantic import BaseModel, HttpUrl, Field
 
@@ -14,11 +14,69 @@ class WAFConfig(BaseModel):
     type: str = "modsecurity"
     log_path: str = "/var/log/modsec_audit.log"
 
+class BenchmarkTarget(BaseModel):
+    name: str # Key of this target in results and reports
+    target: TargetConfig
+    waf: WAFConfig = WAFConfig()
+    rate_limit: float = Field(0.0, ge=0.0) # Attack requests/sec for this target, 0 = run.rate_limit
+    workers: int = Field(0, ge=0) # Max in-flight attack requests for this target, 0 = run.workers
+
+class SamplingConfig(BaseModel):
+    enabled: bool = False # Sample the attack space instead of sending every mutation
+    stratify_by: str = Field("category", pattern="^(category|vector)$")
+    ci_half_width: float = Field(0.05, gt=0.0, le=0.5) # Stop a stratum once its bypass-rate CI is this tight
+    min_samples: int = Field(30, ge=1) # Responses per stratum before the CI is checked
+    max_samples: int = Field(0, ge=0) # Requests per stratum (all targets together), 0 = no cap
+    budget: int = Field(0, ge=0) # Total attack requests (all targets together), 0 = no cap
+    seed: Optional[int] = None # Fixed seed => same draw order
+
+class RunConfig(BaseModel):
+    categories: List[str] = [] # Corpus subset, empty = all
+    vector_ids: List[str] = []
+    workers: int = Field(0, ge=0) # Max in-flight attack requests, 0 = unbounded
+    rate_limit: float = Field(0.0, ge=0.0) # Attack requests/sec, 0 = unlimited
+    pdf_report: bool = True
+    worker_agents: List[str] = [] # Remote worker base URLs, empty = run locally
+    shard_size: int = Field(500, ge=1) # Work items per shard sent to a worker
+    worker_token: str = "" # Shared secret worker agents require on every shard
+    profiler: str = Field("", pattern="^(|cprofile|pyinstrument)$") # '', 'cprofile' or 'pyinstrument'
+    sampling: SamplingConfig = SamplingConfig()
+    dedup: bool = False # Send byte-identical requests once, answer repeats from a verdict cache
+    dedup_cache_size: int = Field(10000, ge=1) # Max cached verdicts (LRU)
+    checkpoint_interval: float = Field(30.0, ge=0.0) # Seconds between checkpoint flushes, 0 = no checkpoints
+
+class ScoringConfig(BaseModel):
+    bypass_weight: float = Field(0.8, ge=0.0) # Weight of the detection rate in the total score
+    fp_weight: float = Field(0.2, ge=0.0) # Weight of the legit pass rate in the total score
+    confidence: float = Field(0.95, gt=0.0, lt=1.0) # Wilson interval confidence level
+    category_weights: Dict[str, float] = {} # Relative weight per attack category, default 1.0
+
+class MockRule(BaseModel):
+    id: str
+    pattern: str
+    msg: str = ""
+    status: int = 403
+
+class MockTargetConfig(BaseModel):
+    host: str = "127.0.0.1"
+    port: int = 8081
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = Field(0.0, ge=0.0, le=1.0)
+    error_status: int = 599 # Scored as an error, 502 / 503 would count as blocks
+    seed: Optional[int] = None # Fixed seed => reproducible latency/error sequence
+    audit_log_path: str = "logs/mock_modsec_audit.log"
+    rules: List[MockRule] = []
+
 class AppConfig:
     def __init__(self):
         self.base_dir = Path(__file__).resolve().parent.parent
         self.target: TargetConfig = self._load_target()
         self.waf: WAFConfig = self._load_waf()
+        self.targets: List[BenchmarkTarget] = self._load_targets() # A/B mode, empty = single target
+        self.run: RunConfig = self._load_run()
+        self.scoring: ScoringConfig = self._load_scoring()
+        self.mock_target: MockTargetConfig = self._load_mock_target()
 
     def _load_yaml(self, filename: str) -> Dict[str, Any]:
         path = self.base_dir / "configs" / filename
@@ -38,4 +96,20 @@ class AppConfig:
         data = self._load_yaml("waf.yaml").get("waf", {})
         return WAFConfig(**data)
 
+    def _load_targets(self) -> List[BenchmarkTarget]:
+        data = self._load_yaml("targets.yaml").get("targets") or []
+        return [BenchmarkTarget(**t) for t in data]
+
+    def _load_run(self) -> RunConfig:
+        data = self._load_yaml("run.yaml").get("run", {})
+        return RunConfig(**data)
+
+    def _load_scoring(self) -> ScoringConfig:
+        data = self._load_yaml("scoring.yaml").get("scoring", {})
+        return ScoringConfig(**data)
+
+    def _load_mock_target(self) -> MockTargetConfig:
+        data = self._load_yaml("mock_target.yaml").get("mock_target", {})
+        return MockTargetConfig(**data)
+
 settings = AppConfig()
@@ -0,0 +1,133 @@
+import json
+import asyncio
+import aiohttp
+from typing import Any, Callable, Dict, List, Optional
+from core.config import settings
+from core.logger import logger
+from core.attack_engine.engine import WorkItem
+from core.analyzer.histogram import LatencyHistogram
+from core.distributed import protocol
+
+# No message for this long (heartbeats included) means the worker is gone
+READ_TIMEOUT = 30
+
+class WorkerLost(Exception):
+    pass
+
+class Coordinator:
+    """
+    Partitions the expanded attack workload into shards, fans them out to
+    worker agents and merges the streamed results. Shards interrupted by a
+    lost worker are re-queued with only their unfinished items and the
+    rate / worker budget is re-split across the remaining agents.
+    """
+
+    def __init__(self, workers: List[str], shard_size: int, token: str):
+        if not token:
+            raise ValueError("Coordinator mode requires the shared worker token (run.worker_token)")
+        self.workers = [w.rstrip("/") if "://" in w else f"http://{w.rstrip('/')}" for w in workers]
+        self.shard_size = shard_size
+        self.token = token
+        self.latency = LatencyHistogram()
+        self.lost_workers: List[str] = []
+
+    async def run(self, items: List[WorkItem], rate_limit: float = 0.0, workers: int = 0,
+                  on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                  run_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        self.latency = LatencyHistogram()
+        self._run_id = run_id
+        self.lost_workers = []
+        self._items = items
+        self._results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        self._remaining = len(items)
+        self._on_result = on_result
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+        for shard_id, start in enumerate(range(0, len(items), self.shard_size)):
+            self._queue.put_nowait((shard_id, list(range(start, min(start + self.shard_size, len(items))))))
+
+        self._rate_limit = rate_limit
+        self._workers = workers
+        self._split_budget()
+
+        logger.info(f"Coordinator: {len(items)} work items in {self._queue.qsize()} shards across {len(self.workers)} workers")
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=READ_TIMEOUT)
+        async with aiohttp.ClientSession(timeout=timeout, headers={protocol.TOKEN_HEADER: self.token}) as session:
+            tasks = [asyncio.create_task(self._worker_loop(session, url)) for url in self.workers]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                # A fatal error in one loop (e.g. a rejected token) stops the others too
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        if self._remaining:
+            raise RuntimeError(f"All worker agents lost with {self._remaining} work items unfinished")
+        return self._results
+
+    def _split_budget(self):
+        # Each live worker runs one shard at a time, so split the budgets evenly
+        n = max(1, len(self.workers) - len(self.lost_workers))
+        self._shard_rate = self._rate_limit / n if self._rate_limit else 0.0
+        self._shard_workers = max(1, self._workers // n) if self._workers else 0
+
+    async def _worker_loop(self, session: aiohttp.ClientSession, url: str):
+        while self._remaining:
+            try:
+                shard_id, indexes = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                # Other workers still hold shards that may come back if they die
+                await asyncio.sleep(0.1)
+                continue
+
+            try:
+                await self._run_shard(session, url, shard_id, indexes)
+            except (aiohttp.ClientError, asyncio.TimeoutError, WorkerLost, json.JSONDecodeError) as e:
+                unfinished = [i for i in indexes if self._results[i] is None]
+                logger.error(f"Worker {url} lost on shard {shard_id} ({e!r}), re-queueing {len(unfinished)} items")
+                if unfinished:
+                    self._queue.put_nowait((shard_id, unfinished))
+                self.lost_workers.append(url)
+                # Shards sent from now on carry the larger share
+                self._split_budget()
+                return
+
+    async def _run_shard(self, session: aiohttp.ClientSession, url: str, shard_id: int, indexes: List[int]):
+        spec = {
+            "shard_id": shard_id,
+            "run_id": self._run_id,
+            "target": settings.target.model_dump(),
+            "rate_limit": self._shard_rate,
+            "workers": self._shard_workers,
+            "items": [protocol.encode_item(i, self._items[i]) for i in indexes],
+        }
+        logger.info(f"Shard {shard_id} ({len(indexes)} items) -> {url}")
+        async with session.post(url + protocol.SHARD_PATH, json=spec) as response:
+            if response.status in (401, 403):
+                raise RuntimeError(f"Worker {url} rejected the shard token")
+            if response.status != 200:
+                raise WorkerLost(f"HTTP {response.status}")
+            async for line in response.content:
+                if not line.strip():
+                    continue
+                msg = json.loads(line)
+                if msg["type"] == "batch":
+                    self._merge_batch(msg["results"])
+                elif msg["type"] == "done":
+                    return
+        raise WorkerLost("stream ended before shard completed")
+
+    def _merge_batch(self, rows: List[List[Any]]):
+        for row in rows:
+            index = row[0]
+            if self._results[index] is not None:
+                continue # Duplicate from a re-run shard
+            result = protocol.unpack_result(row, self._items[index])
+            self._results[index] = result
+            self._remaining -= 1
+            # Per row, so shards cut short by a lost worker still count
+            if "error" not in result:
+                self.latency.add(result["latency"])
+            if self._on_result:
+                self._on_result(result)
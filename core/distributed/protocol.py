@@ -0,0 +1,55 @@
+"""
+Coordinator <-> worker wire format.
+
+The coordinator POSTs a shard as JSON to `/api/v1/shards`, authenticated with
+the shared token in the `X-WBT-Worker-Token` header; the worker answers
+with a streamed NDJSON body made of `batch`, `heartbeat` and a final `done`
+message. Results are sent as compact rows indexed by the coordinator's work
+item number, the coordinator keeps the full vector/payload on its side.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from core.attack_engine.engine import WorkItem
+
+SHARD_PATH = "/api/v1/shards"
+HEALTH_PATH = "/api/v1/health"
+TOKEN_HEADER = "X-WBT-Worker-Token" # Shared secret, shards without it are rejected
+
+BATCH_INTERVAL = 0.25 # Seconds between result batches
+HEARTBEAT_INTERVAL = 5.0 # Idle keep-alive so the coordinator can detect dead workers
+MAX_BATCH_ROWS = 256 # Keeps each NDJSON line well under aiohttp's line limit
+
+def encode_item(index: int, item: WorkItem) -> List[Any]:
+    vector, payload, mutation_id, family = item
+    return [index, vector["id"], vector["category"], vector.get("method", "GET"), vector.get("location", "query"), payload, mutation_id, family]
+
+def decode_item(row: List[Any]) -> Tuple[int, WorkItem]:
+    index, vector_id, category, method, location, payload, mutation_id, family = row
+    vector = {"id": vector_id, "category": category, "method": method, "location": location}
+    return index, (vector, payload, mutation_id, family)
+
+def pack_result(index: int, result: Dict[str, Any]) -> List[Any]:
+    """
+    [index, status, latency_ms, response_len, error]
+    """
+    latency = round(result.get("latency", 0.0), 3)
+    if "error" in result:
+        return [index, None, latency, 0, result["error"]]
+    return [index, result["status"], latency, result["response_len"], None]
+
+def unpack_result(row: List[Any], item: WorkItem) -> Dict[str, Any]:
+    index, status, latency, response_len, error = row
+    vector, payload, mutation_id, family = item
+    result: Dict[str, Any] = {
+        "vector_id": vector["id"],
+        "mutation_id": mutation_id,
+        "mutation_family": family,
+        "category": vector["category"],
+    }
+    if error is not None:
+        result["error"] = error
+        return result
+    result.update({"payload": payload, "status": status, "response_len": response_len, "latency": latency})
+    return result
+
+def message(kind: str, shard_id: Optional[int] = None, **fields) -> Dict[str, Any]:
+    return {"type": kind, "shard_id": shard_id, **fields}
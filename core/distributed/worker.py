@@ -0,0 +1,126 @@
+import hmac
+import json
+import uuid
+import asyncio
+import aiohttp
+from typing import Any, Callable, Dict, List, Optional
+from aiohttp import web
+from core.config import TargetConfig
+from core.logger import logger
+from core.attack_engine.engine import AttackEngine, RunContext
+from core.distributed import protocol
+
+class WorkerAgent:
+    """
+    Remote load generator. Executes shards pushed by a coordinator and streams
+    compact result batches back on the same HTTP response. Shards are only
+    accepted with the shared `token` the coordinator was configured with.
+    """
+
+    def __init__(self, token: str):
+        if not token:
+            raise ValueError("Worker agents require a shared token")
+        self.token = token
+        self.engine = AttackEngine()
+        self.active_shards = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    def build_app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_get(protocol.HEALTH_PATH, self._handle_health)
+        app.router.add_post(protocol.SHARD_PATH, self._handle_shard)
+        return app
+
+    async def start(self, host: str, port: int) -> str:
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        logger.info(f"WBT worker agent listening on {host}:{bound_port}")
+        return f"http://{host}:{bound_port}"
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok", "active_shards": self.active_shards})
+
+    async def _handle_shard(self, request: web.Request) -> web.StreamResponse:
+        if not hmac.compare_digest(request.headers.get(protocol.TOKEN_HEADER, "").encode(), self.token.encode()):
+            logger.warning(f"Rejected shard from {request.remote}: bad or missing token")
+            raise web.HTTPUnauthorized()
+        spec = await request.json()
+        shard_id = spec["shard_id"]
+        items = [protocol.decode_item(row) for row in spec["items"]]
+        # Per shard, concurrent shards may target different URLs
+        target = TargetConfig(**spec["target"])
+
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+
+        pending: List[List[Any]] = []
+
+        def collect(index: int) -> Callable[[Dict[str, Any]], None]:
+            def on_result(result: Dict[str, Any]):
+                pending.append(protocol.pack_result(index, result))
+            return on_result
+
+        async def execute():
+            async with aiohttp.ClientSession() as session:
+                ctx = RunContext(spec.get("run_id") or uuid.uuid4().hex[:12], session, target,
+                                 spec.get("rate_limit", 0.0), spec.get("workers", 0))
+                await asyncio.gather(*(
+                    self.engine.dispatch(ctx, item, collect(index))
+                    for index, item in items
+                ))
+
+        logger.info(f"Shard {shard_id}: {len(items)} items | rate={spec.get('rate_limit', 0)}")
+        self.active_shards += 1
+        runner = asyncio.create_task(execute())
+        idle = 0.0
+        try:
+            while not runner.done():
+                await asyncio.wait({runner}, timeout=protocol.BATCH_INTERVAL)
+                if pending:
+                    idle = 0.0
+                    await self._flush(response, shard_id, pending)
+                else:
+                    idle += protocol.BATCH_INTERVAL
+                    if idle >= protocol.HEARTBEAT_INTERVAL:
+                        idle = 0.0
+                        await self._send(response, protocol.message("heartbeat", shard_id))
+
+            runner.result() # Surface unexpected failures
+            if pending:
+                await self._flush(response, shard_id, pending)
+            await self._send(response, protocol.message("done", shard_id))
+        except (ConnectionResetError, asyncio.CancelledError):
+            logger.warning(f"Shard {shard_id}: coordinator went away, aborting")
+            runner.cancel()
+            raise
+        finally:
+            self.active_shards -= 1
+
+        await response.write_eof()
+        return response
+
+    async def _flush(self, response: web.StreamResponse, shard_id: int, pending: List[List[Any]]):
+        # Detach the batch before awaiting, results keep arriving during the write
+        batch = pending[:]
+        pending.clear()
+        for i in range(0, len(batch), protocol.MAX_BATCH_ROWS):
+            await self._send(response, protocol.message("batch", shard_id, results=batch[i:i + protocol.MAX_BATCH_ROWS]))
+
+    async def _send(self, response: web.StreamResponse, msg: Dict[str, Any]):
+        await response.write((json.dumps(msg) + "\n").encode())
+
+async def serve(host: str, port: int, token: str):
+    agent = WorkerAgent(token)
+    await agent.start(host, port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await agent.stop()
@@ -1,17 +1,29 @@
+import json
+import uuid
 import asyncio
+import contextlib
 import aiohttp
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional, Tuple
 from core.logger import logger
-from core.config import settings
+from core.config import settings, TargetConfig
+from core.telemetry.metrics import metrics
+from core.attack_engine.templates import REQUEST_ID_HEADER, request_id, work_key, result_key
+from core.attack_engine.dedup import VerdictCache, request_digest
 
 class LegitSimulator:
     def __init__(self):
         self.results: List[Dict[str, Any]] = []
+        self.dedup: Optional[VerdictCache] = None # Verdict cache of the last run, if dedup is on
 
-    async def run(self) -> List[Dict[str, Any]]:
+    async def run(self, on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                  run_id: Optional[str] = None,
+                  completed: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
         logger.info("Starting Legitimate Traffic Simulation")
+        run_id = run_id or uuid.uuid4().hex[:12]
+        self.dedup = VerdictCache(settings.run.dedup_cache_size) if settings.run.dedup else None
+        # Requests already made by a checkpointed earlier attempt of this run
+        done = {result_key(r) for r in completed or [] if "scenario" in r}
         
-        target_url = settings.target.url
         # Define some common legitimate paths/actions
         scenarios = [
             {"method": "GET", "path": "/", "name": "Homepage"},
@@ -21,31 +33,87 @@ class LegitSimulator:
             {"method": "POST", "path": "/contact", "data": {"message": "Hello support"}, "name": "Contact Form"},
         ]
         
-        async with aiohttp.ClientSession() as session:
+        # Same baseline against every A/B target, one session per target
+        targets = [(t.name, t.target) for t in settings.targets] or [(None, settings.target)]
+        async with contextlib.AsyncExitStack() as stack:
             tasks = []
-            for scenario in scenarios:
-                # Simulate multiple users
-                for i in range(settings.target.concurrency // 2): 
-                    tasks.append(self._simulate_user(session, scenario, i))
+            for name, target in targets:
+                session = await stack.enter_async_context(aiohttp.ClientSession())
+                prefix = request_id(run_id, name) if name else run_id
+                for scenario in scenarios:
+                    # Simulate multiple users
+                    for i in range(settings.target.concurrency // 2): 
+                        if done and work_key(name, "legit", scenario["name"], i) in done:
+                            continue
+                        tasks.append(self._simulate_user(session, target, name, scenario, i, prefix, on_result))
             
             self.results = await asyncio.gather(*tasks)
             
         logger.info(f"Legit Traffic Simulation finished. Total requests: {len(self.results)}")
         return self.results
 
-    async def _simulate_user(self, session: aiohttp.ClientSession, scenario: Dict, user_id: int) -> Dict[str, Any]:
-        url = f"{settings.target.url.rstrip('/')}{scenario['path']}"
+    async def _simulate_user(self, session: aiohttp.ClientSession, target: TargetConfig, name: Optional[str], scenario: Dict,
+                             user_id: int, id_prefix: str,
+                             on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        request = self._request(target, scenario, user_id, id_prefix)
+        if self.dedup is None:
+            result = await self._send_tracked(session, target, scenario, user_id, request)
+        else:
+            result = await self._send_deduped(session, target, scenario, user_id, request)
+        if name:
+            result["target"] = name
+        if not result.get("cached"):
+            metrics.inc("wbt_requests_total", kind="legit", status=result.get("status", "error"))
+        if on_result:
+            on_result(result)
+        return result
+
+    async def _send_tracked(self, session: aiohttp.ClientSession, target: TargetConfig, scenario: Dict, user_id: int,
+                            request: Tuple[str, str, Dict[str, str], Any]) -> Dict[str, Any]:
+        metrics.add("wbt_requests_in_flight", 1, kind="legit")
+        try:
+            return await self._send(session, target, scenario, user_id, request)
+        finally:
+            metrics.add("wbt_requests_in_flight", -1, kind="legit")
+
+    async def _send_deduped(self, session: aiohttp.ClientSession, target: TargetConfig, scenario: Dict, user_id: int,
+                            request: Tuple[str, str, Dict[str, str], Any]) -> Dict[str, Any]:
+        method, url, headers, data = request
+        key = request_digest(method, url, headers.items(), json.dumps(data).encode() if data is not None else None)
+        verdict = await self.dedup.get(key)
+        if verdict is not None:
+            metrics.inc("wbt_dedup_hits_total", kind="legit")
+            return {"type": "legit", "scenario": scenario["name"], "user_id": user_id, **verdict, "cached": True}
+
+        verdict = None
+        try:
+            result = await self._send_tracked(session, target, scenario, user_id, request)
+            if "error" not in result:
+                verdict = {"status": result["status"]}
+            return result
+        finally:
+            self.dedup.put(key, verdict)
+
+    def _request(self, target: TargetConfig, scenario: Dict, user_id: int, id_prefix: str) -> Tuple[str, str, Dict[str, str], Any]:
+        url = f"{target.url.rstrip('/')}{scenario['path']}"
         method = scenario["method"]
-        data = scenario.get("data")
+        data = scenario.get("data") if method == "POST" else None
         
-        headers = settings.target.headers.copy() if settings.target.headers else {}
+        headers = target.headers.copy() if target.headers else {}
         headers["X-WBT-Legit"] = "true"
         headers["X-WBT-User"] = str(user_id)
+        headers[REQUEST_ID_HEADER] = request_id(id_prefix, "legit", scenario["name"], user_id)
+        return method, url, headers, data
+
+    async def _send(self, session: aiohttp.ClientSession, target: TargetConfig, scenario: Dict, user_id: int,
+                    request: Tuple[str, str, Dict[str, str], Any]) -> Dict[str, Any]:
+        method, url, headers, data = request
         
         try:
             start_time = asyncio.get_event_loop().time()
-            async with session.request(method, url, json=data if method == "POST" else None, headers=headers, timeout=settings.target.timeout) as response:
+            async with session.request(method, url, json=data, headers=headers, timeout=target.timeout) as response:
                 end_time = asyncio.get_event_loop().time()
+                metrics.record_phase("network_wait", end_time - start_time)
                 await response.read()
                 
                 return {
@@ -0,0 +1,202 @@
+import re
+import sys
+import json
+import random
+import asyncio
+import datetime
+import urllib.parse
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from aiohttp import web
+from core.config import settings, MockTargetConfig, MockRule
+from core.logger import logger
+
+BASE_DIR = Path(__file__).parent.parent.parent
+
+class MockWAFServer:
+    """
+    Localhost stand-in for the WAF + backend pair (modsecurity-crs + whoami).
+    Applies regex block rules with configurable latency / error injection and
+    writes ModSecurity v3 style JSON audit lines, so WBT's own throughput can
+    be measured without the docker-compose stack.
+    """
+
+    def __init__(self, config: Optional[MockTargetConfig] = None):
+        self.config = config or settings.mock_target
+        self.rules: List[Tuple[MockRule, re.Pattern]] = [
+            (rule, re.compile(rule.pattern, re.IGNORECASE)) for rule in self.config.rules
+        ]
+        self.rng = random.Random(self.config.seed)
+        self.stats = {"requests": 0, "blocked": 0, "passed": 0, "errors": 0}
+        self._audit_file = None
+        self._runner: Optional[web.AppRunner] = None
+        self._counter = 0
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self._handle)
+        app.on_startup.append(self._open_audit_log)
+        app.on_cleanup.append(self._close_audit_log)
+        return app
+
+    async def start(self, host: Optional[str] = None, port: Optional[int] = None) -> str:
+        """
+        Starts serving in the current event loop. Pass port=0 for an ephemeral port.
+        Returns the base URL the server is reachable on.
+        """
+        host = host or self.config.host
+        port = self.config.port if port is None else port
+
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+
+        bound_port = site._server.sockets[0].getsockname()[1]
+        url = f"http://{host}:{bound_port}"
+        logger.info(f"Mock WAF target listening on {url} ({len(self.rules)} rules)")
+        return url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _open_audit_log(self, app: web.Application):
+        if not self.config.audit_log_path:
+            return
+        path = Path(self.config.audit_log_path)
+        if not path.is_absolute():
+            path = BASE_DIR / path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Line buffered like ModSecurity's serial log, so entries are readable as soon as
+        # the response is sent (and lines from several mock instances don't interleave)
+        self._audit_file = open(path, "a", buffering=1)
+
+    async def _close_audit_log(self, app: web.Application):
+        if self._audit_file:
+            self._audit_file.close()
+            self._audit_file = None
+
+    def match(self, uri: str, headers: Dict[str, str], body: str) -> Optional[Tuple[MockRule, str]]:
+        """
+        Returns the first rule matching the request, along with the matched data.
+        """
+        # CRS inspects URL-decoded data (t:urlDecodeUni), mirror that here, form bodies included
+        content_type = next((v for k, v in headers.items() if k.lower() == "content-type"), "")
+        if content_type.startswith("application/x-www-form-urlencoded"):
+            body = urllib.parse.unquote_plus(body)
+        candidates = [urllib.parse.unquote_plus(uri), body]
+        candidates.extend(v for k, v in headers.items() if k.lower() != "host")
+
+        for rule, regex in self.rules:
+            for data in candidates:
+                if not data:
+                    continue
+                m = regex.search(data)
+                if m:
+                    return rule, m.group(0)
+        return None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.stats["requests"] += 1
+        self._counter += 1
+
+        body = await request.text() if request.can_read_body else ""
+        headers = dict(request.headers)
+
+        delay = self.config.latency_ms + self.rng.uniform(0, self.config.latency_jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        messages = []
+        if self.config.error_rate and self.rng.random() < self.config.error_rate:
+            self.stats["errors"] += 1
+            status = self.config.error_status
+            payload = {"error": "injected upstream failure"}
+        else:
+            hit = self.match(request.raw_path, headers, body)
+            if hit:
+                rule, data = hit
+                self.stats["blocked"] += 1
+                status = rule.status
+                payload = {"error": "Forbidden", "rule_id": rule.id}
+                messages.append(self._audit_message(rule, data))
+            else:
+                self.stats["passed"] += 1
+                status = 200
+                payload = {"status": "ok", "path": request.path}
+
+        self._write_audit(request, headers, status, messages)
+        return web.json_response(payload, status=status)
+
+    def _audit_message(self, rule: MockRule, data: str) -> Dict[str, Any]:
+        return {
+            "message": rule.msg,
+            "details": {
+                "match": f"Matched \"Operator `Rx' with parameter `{rule.pattern}'",
+                "reference": "",
+                "ruleId": rule.id,
+                "file": "mock_target.yaml",
+                "lineNumber": "0",
+                "data": f"Matched Data: {data[:128]}",
+                "severity": "2",
+                "ver": "WBT-MOCK",
+                "rev": "",
+                "tags": [],
+                "maturity": "0",
+                "accuracy": "0"
+            }
+        }
+
+    def _write_audit(self, request: web.Request, headers: Dict[str, str], status: int, messages: List[Dict[str, Any]]):
+        if not self._audit_file:
+            return
+
+        peer = request.transport.get_extra_info("peername") if request.transport else None
+        client_ip, client_port = (peer[0], peer[1]) if peer else ("", 0)
+        entry = {
+            "transaction": {
+                "client_ip": client_ip,
+                "time_stamp": datetime.datetime.now().strftime("%a %b %d %H:%M:%S %Y"),
+                "server_id": "wbt-mock",
+                "client_port": client_port,
+                "host_ip": self.config.host,
+                "host_port": self.config.port,
+                "unique_id": f"wbt-mock-{self._counter}",
+                "request": {
+                    "method": request.method,
+                    "http_version": float(f"{request.version.major}.{request.version.minor}"),
+                    "uri": request.raw_path,
+                    "headers": headers
+                },
+                "response": {
+                    "http_code": status,
+                    "headers": {}
+                },
+                "producer": {
+                    "modsecurity": "ModSecurity v3 (WBT mock)",
+                    "connector": "aiohttp",
+                    "secrules_engine": "Enabled",
+                    "components": []
+                },
+                "messages": messages
+            }
+        }
+        self._audit_file.write(json.dumps(entry) + "\n")
+
+async def serve(host: Optional[str] = None, port: Optional[int] = None):
+    server = MockWAFServer()
+    await server.start(host, port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+if __name__ == "__main__":
+    # python -m core.mock_target.server [port]
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    try:
+        asyncio.run(serve(port=port))
+    except KeyboardInterrupt:
+        pass
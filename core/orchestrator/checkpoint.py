@@ -0,0 +1,132 @@
+import os
+import re
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from core.config import settings, TargetConfig, WAFConfig, RunConfig, BenchmarkTarget
+from core.logger import logger
+
+CHECKPOINT_DIR = Path(__file__).parent.parent.parent / "checkpoints"
+RUN_ID = re.compile(r"[A-Za-z0-9_-]+")
+
+class RunCheckpoint:
+    """
+    On-disk progress of one run: `<run_id>.jsonl` holds completed results
+    (append only), `<run_id>.json` the run config and progress. Aggregates
+    are not stored, a resume rebuilds them by replaying the results.
+    Results are buffered and flushed every `interval` seconds. Errored
+    results are not checkpointed, so they are retried on resume.
+    """
+
+    def __init__(self, run_id: str, mode: str, started_at: float, interval: float):
+        self.run_id = run_id
+        self.mode = mode
+        self.started_at = started_at
+        self.interval = interval
+        self.completed = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._last_flush = time.monotonic()
+        self._config = self._capture_config()
+
+    @property
+    def state_path(self) -> Path:
+        return CHECKPOINT_DIR / f"{self.run_id}.json"
+
+    @property
+    def results_path(self) -> Path:
+        return CHECKPOINT_DIR / f"{self.run_id}.jsonl"
+
+    def _capture_config(self) -> Dict[str, Any]:
+        # Everything that decides the workload, restored as-is on resume. Secrets stay out of the file
+        return {
+            "target": settings.target.model_dump(),
+            "waf": settings.waf.model_dump(),
+            "targets": [t.model_dump() for t in settings.targets],
+            "run": settings.run.model_dump(exclude={"worker_token"}),
+        }
+
+    def record(self, result: Dict[str, Any]):
+        if "error" in result:
+            return
+        self._buffer.append(result)
+        if time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Appends buffered results, then atomically rewrites the state file.
+        """
+        CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
+        self._last_flush = time.monotonic()
+        if self._buffer:
+            with open(self.results_path, "a") as f:
+                f.write("".join(json.dumps(r) + "\n" for r in self._buffer))
+            self.completed += len(self._buffer)
+            self._buffer = []
+
+        state = {
+            "run_id": self.run_id,
+            "mode": self.mode,
+            "started_at": self.started_at,
+            "updated_at": time.time(),
+            "completed": self.completed,
+            "config": self._config,
+        }
+        tmp = self.state_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, self.state_path)
+
+    def discard(self):
+        for path in (self.state_path, self.results_path):
+            path.unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, run_id: str) -> Tuple["RunCheckpoint", List[Dict[str, Any]]]:
+        """
+        Restores the run config into settings and returns the checkpoint
+        together with the results completed so far. The caller puts the
+        previous settings back once the resumed run ends.
+        """
+        if not RUN_ID.fullmatch(run_id):
+            raise ValueError(f"Invalid run id '{run_id}'")
+        state_path = CHECKPOINT_DIR / f"{run_id}.json"
+        if not state_path.exists():
+            raise FileNotFoundError(f"No checkpoint for run {run_id}")
+        state = json.loads(state_path.read_text())
+
+        config = state["config"]
+        settings.target = TargetConfig(**config["target"])
+        settings.waf = WAFConfig(**config["waf"])
+        settings.targets = [BenchmarkTarget(**t) for t in config["targets"]]
+        # The worker token isn't checkpointed, keep the one this process was started with
+        settings.run = RunConfig(**{**config["run"], "worker_token": settings.run.worker_token})
+
+        checkpoint = cls(run_id, state["mode"], state["started_at"], settings.run.checkpoint_interval or 30.0)
+        results = []
+        path = checkpoint.results_path
+        if path.exists():
+            data = path.read_bytes()
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                # Torn last line from a crash mid-write, drop it so appends stay line aligned
+                logger.warning(f"Dropping incomplete last line of {path}")
+                with open(path, "r+b") as f:
+                    f.truncate(end)
+            results = [json.loads(line) for line in data[:end].splitlines()]
+        checkpoint.completed = len(results)
+        logger.info(f"Resuming run {run_id}: {len(results)} completed results")
+        return checkpoint, results
+
+def list_checkpoints() -> List[Dict[str, Any]]:
+    """
+    Summaries of the resumable runs, newest first.
+    """
+    runs = []
+    for path in CHECKPOINT_DIR.glob("*.json"):
+        try:
+            state = json.loads(path.read_text())
+        except (OSError, json.JSONDecodeError):
+            continue
+        runs.append({k: state.get(k) for k in ("run_id", "mode", "started_at", "updated_at", "completed")})
+    return sorted(runs, key=lambda r: r["updated_at"] or 0, reverse=True)
@@ -1,5 +1,7 @@
+import time
+import uuid
 import asyncio
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Any, Callable, Tuple
 from core.config import settings
 from core.logger import logger
 from core.attack_engine.engine import AttackEngine
@@ -7,6 +9,12 @@ from core.legit_traffic.simulator import LegitSimulator
 from core.analyzer.detector import DetectionEngine
 from core.scoring.calculator import ScoringEngine
 from core.reporting.generator import ReportGenerator
+from core.distributed.coordinator import Coordinator
+from core.telemetry.metrics import metrics
+from core.telemetry.profiler import RunProfiler
+from core.orchestrator.checkpoint import RunCheckpoint
+from core.attack_engine.templates import result_key
+from waf_adapters import get_waf_adapter, BaseWAFAdapter
 
 class TrafficOrchestrator:
     def __init__(self):
@@ -17,11 +25,15 @@ class TrafficOrchestrator:
         self.detector = DetectionEngine()
         self.scorer = ScoringEngine()
         self.reporter = ReportGenerator()
+        self.run_id: Optional[str] = None
         
-    async def start_benchmark(self, mode: str = "concurrent"):
+    async def start_benchmark(self, mode: str = "concurrent", on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                              resume: Optional[str] = None):
         """
         Starts the benchmark process.
         :param mode: 'concurrent' (mixed traffic) or 'sequential' (legit then attack)
+        :param on_result: optional callback invoked with each result as it completes
+        :param resume: run id of a checkpointed run to continue (its config and mode are restored)
         """
         async with self.lock:
             if self.running:
@@ -29,48 +41,131 @@ class TrafficOrchestrator:
                 return {"status": "error", "message": "Benchmark already running"}
             
             self.running = True
+
+        checkpoint = None
+        completed: List[Dict[str, Any]] = []
+        previous_settings = None
+        if resume:
+            # The resumed run's config only applies to this run, later runs use configs/*.yaml again
+            previous_settings = (settings.target, settings.waf, settings.targets, settings.run)
+            try:
+                checkpoint, completed = RunCheckpoint.load(resume)
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"❌ Cannot resume run {resume}: {e}")
+                settings.target, settings.waf, settings.targets, settings.run = previous_settings
+                self.running = False
+                return {"status": "error", "message": f"Cannot resume run {resume}: {e}"}
+            mode = checkpoint.mode
             
         logger.info(f"🚀 INITIALIZING BENCHMARK SEQUENCE")
-        logger.info(f"Target: {settings.target.url} | Mode: {mode.upper()}")
+        if settings.targets:
+            logger.info(f"Targets: {', '.join(f'{t.name}={t.target.url}' for t in settings.targets)} | Mode: {mode.upper()}")
+            ignored = [t.name for t in settings.targets if t.target.evasion_level != settings.target.evasion_level]
+            if ignored:
+                logger.warning(f"Per-target evasion_level ignored for {ignored}, all targets get the corpus built at level {settings.target.evasion_level}")
+        else:
+            logger.info(f"Target: {settings.target.url} | Mode: {mode.upper()}")
+
+        metrics.reset_run(payload_load=self.attack_engine.load_seconds)
+        metrics.set("wbt_benchmark_running", 1)
+        metrics.start_loop_monitor()
+        profiler = None
+        self.run_id = checkpoint.run_id if checkpoint else uuid.uuid4().hex[:12]
+        self.scorer.reset()
+        started_at = checkpoint.started_at if checkpoint else time.time()
+        if not checkpoint and settings.run.checkpoint_interval:
+            checkpoint = RunCheckpoint(self.run_id, mode, started_at, settings.run.checkpoint_interval)
+
+        # Feed the scorer as results stream in so the live score stays current
+        def observe(result: Dict[str, Any]):
+            self.scorer.observe(result)
+            if checkpoint:
+                checkpoint.record(result)
+            if on_result:
+                on_result(result)
         
         try:
+            if checkpoint:
+                # Written up front so the run is resumable from the start
+                checkpoint.flush()
+                logger.info(f"Checkpointing run {self.run_id} every {checkpoint.interval:g}s")
+            # Replay finished work so aggregates and streamed reports cover the whole run
+            for result in completed:
+                self.scorer.observe(result)
+                if on_result:
+                    on_result(result)
+
             attack_results = []
             legit_results = []
+            # A fresh run only reads WAF log entries written from here on, a resume re-reads them
+            waf_adapters = self._waf_adapters(mark=not resume)
+
+            if settings.run.profiler:
+                profiler = RunProfiler(settings.run.profiler)
+                profiler.start()
 
-            if mode == "sequential":
-                legit_results, attack_results = await self._run_sequential()
-            else:
-                legit_results, attack_results = await self._run_concurrent()
+            with metrics.span("traffic"):
+                if mode == "sequential":
+                    legit_results, attack_results = await self._run_sequential(observe, completed)
+                else:
+                    legit_results, attack_results = await self._run_concurrent(observe, completed)
             
             # Combine results
-            all_results = attack_results + legit_results
+            all_results = attack_results + legit_results + completed
             
-            # TODO: Fetch WAF logs via Adapter here if needed for correlation
-            waf_logs = [] 
+            with metrics.span("waf_correlate"):
+                waf_logs = await self._correlate(all_results, waf_adapters, started_at, time.time())
             
             # Analyze
             logger.info("🔍 PHASE: Analysis & Correlation")
             stats = self.detector.analyze(all_results, waf_logs)
+            if settings.targets:
+                # A/B mode: counts across all targets describe no single WAF, keep them apart
+                stats = {"pooled": stats}
+            stats["run_id"] = self.run_id
+            stats["latency_ms"] = self.attack_engine.latency.summary()
+            if self.attack_engine.sampling:
+                stats["sampling"] = self.attack_engine.sampling
+            if settings.run.dedup:
+                stats["dedup"] = self._dedup_summary()
             
             # Score
-            score_data = self.scorer.calculate_score(stats)
+            with metrics.span("scoring"):
+                score_data = self.scorer.calculate_score(stats)
             stats.update(score_data)
-            logger.info(f"📊 SCORED: {score_data['total_score']}/100")
+            for name, target_stats in stats.get("targets", {}).items():
+                target_results = [r for r in all_results if r.get("target") == name]
+                target_stats.update(self.detector.analyze(target_results, []))
+                if name in self.attack_engine.target_latency:
+                    target_stats["latency_ms"] = self.attack_engine.target_latency[name].summary()
+            stats["phases"] = metrics.phase_summary()
+            for name, target_stats in [("", stats), *stats.get("targets", {}).items()]:
+                if "total_score" in target_stats:
+                    logger.info(f"📊 SCORED: {f'[{name}] ' if name else ''}{target_stats['total_score']}/100")
             
             # Report
             logger.info("📝 PHASE: Report Generation")
             json_report = self.reporter.generate_json(stats)
-            pdf_report = self.reporter.generate_pdf(stats)
+            pdf_report = self.reporter.generate_pdf(stats) if settings.run.pdf_report else None
+            profile_report = profiler.stop() if profiler else None
+            profiler = None
+            if checkpoint:
+                checkpoint.discard()
+                checkpoint = None
             
             logger.info("✅ BENCHMARK COMPLETE successfully.")
             
             return {
                 "status": "success", 
                 "message": "Benchmark completed", 
+                "run_id": self.run_id,
+                "resumed_results": len(completed),
                 "results": stats,
+                "phases": metrics.phase_summary(),
                 "reports": {
                     "json": json_report,
-                    "pdf": pdf_report
+                    "pdf": pdf_report,
+                    "profile": profile_report
                 }
             }
         except Exception as e:
@@ -79,24 +174,111 @@ class TrafficOrchestrator:
             logger.error(traceback.format_exc())
             return {"status": "error", "message": str(e)}
         finally:
+            if profiler:
+                profiler.stop()
+            if checkpoint:
+                checkpoint.flush()
+                logger.info(f"Checkpoint saved, resume with run id {self.run_id}")
+            if previous_settings:
+                settings.target, settings.waf, settings.targets, settings.run = previous_settings
+            metrics.set("wbt_benchmark_running", 0)
             self.running = False
 
-    async def _run_sequential(self):
+    async def _run_sequential(self, on_result=None, completed=None):
         logger.info("--- Phase 1: Legitimate Traffic Baseline ---")
-        legit_results = await self.legit_simulator.run()
+        legit_results = await self.legit_simulator.run(on_result, self.run_id, completed)
         
         logger.info("--- Phase 2: Attack Traffic Injection ---")
-        attack_results = await self.attack_engine.run()
+        attack_results = await self._run_attacks(on_result, completed)
         
         return legit_results, attack_results
 
-    async def _run_concurrent(self):
+    async def _run_concurrent(self, on_result=None, completed=None):
         logger.info("--- Starting Concurrent Traffic Simulation ---")
         results = await asyncio.gather(
-            self.legit_simulator.run(),
-            self.attack_engine.run()
+            self.legit_simulator.run(on_result, self.run_id, completed),
+            self._run_attacks(on_result, completed)
         )
         logger.info("--- Traffic Simulation Complete ---")
         return results[0], results[1]
 
+    async def _run_attacks(self, on_result=None, completed=None):
+        if settings.run.worker_agents and settings.targets:
+            logger.warning("A/B targets are not supported with worker agents, running attacks locally")
+        if not settings.run.worker_agents or settings.targets:
+            return await self.attack_engine.run(on_result, self.run_id, completed)
+
+        # Coordinator mode: expand locally, execute on the worker agents
+        logger.info(f"--- Distributing attack workload to {len(settings.run.worker_agents)} workers ---")
+        if settings.run.sampling.enabled:
+            logger.warning("Sampling is not supported with worker agents, sending the full workload")
+        engine = self.attack_engine
+        engine.sampling = None
+        engine.dedup = None
+        done = {result_key(r) for r in completed or [] if "vector_id" in r}
+        items = engine.pending(engine.expand(engine.select_vectors()), done)
+        coordinator = Coordinator(settings.run.worker_agents, settings.run.shard_size, settings.run.worker_token)
+        engine.results = await coordinator.run(items, settings.run.rate_limit, settings.run.workers, on_result,
+                                               self.run_id)
+        engine.latency = coordinator.latency
+        if coordinator.lost_workers:
+            logger.warning(f"Lost worker agents during run: {coordinator.lost_workers}")
+        return engine.results
+
+    def _waf_adapters(self, mark: bool) -> List[Tuple[Optional[str], Optional[BaseWAFAdapter]]]:
+        """
+        One (target name, adapter) per WAF, a single unnamed one outside A/B
+        mode. With `mark`, adapters skip log entries written before this call.
+        """
+        adapters = []
+        for name, waf in [(t.name, t.waf) for t in settings.targets] or [(None, settings.waf)]:
+            try:
+                adapter = get_waf_adapter(waf)
+                if mark:
+                    adapter.mark()
+            except Exception as e:
+                logger.warning(f"WAF adapter unavailable, skipping rule correlation: {e}")
+                adapter = None
+            adapters.append((name, adapter))
+        return adapters
+
+    async def _correlate(self, results: List[Dict[str, Any]], adapters: List[Tuple[Optional[str], Optional[BaseWAFAdapter]]],
+                         start_time: float, end_time: float) -> List[Dict[str, Any]]:
+        """
+        Fetches WAF logs (per target adapter in A/B mode), feeds triggered
+        rules to the scorer and returns all fetched entries.
+        """
+        all_logs = []
+        for name, adapter in adapters:
+            waf_logs = await self._fetch_waf_logs(adapter, start_time, end_time)
+            target_results = results if name is None else [r for r in results if r.get("target") == name]
+            self.scorer.observe_rules(self.detector.correlate(target_results, waf_logs, self.run_id))
+            all_logs.extend(waf_logs)
+        return all_logs
+
+    async def _fetch_waf_logs(self, adapter: Optional[BaseWAFAdapter], start_time: float, end_time: float) -> List[Dict[str, Any]]:
+        # Rule attribution is best effort, the run is still scored without logs
+        if adapter is None:
+            return []
+        try:
+            # Request ids start with the run id, entries of other runs can be skipped unparsed
+            return await adapter.get_logs(start_time, end_time, id_prefix=self.run_id)
+        except Exception as e:
+            logger.warning(f"Could not fetch WAF logs for correlation: {e}")
+            return []
+
+    def _dedup_summary(self) -> Dict[str, Any]:
+        summary = {}
+        hits = lookups = 0
+        for kind, cache in (("attack", self.attack_engine.dedup), ("legit", self.legit_simulator.dedup)):
+            if cache:
+                summary[kind] = cache.summary()
+                hits += cache.hits
+                lookups += cache.hits + cache.misses
+        summary["hit_ratio"] = round(hits / lookups, 4) if lookups else 0.0
+        return summary
+
+    def live_stats(self) -> Dict[str, Any]:
+        return {"running": self.running, "run_id": self.run_id, **self.scorer.live_score()}
+
 orchestrator = TrafficOrchestrator()
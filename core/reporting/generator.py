@@ -2,12 +2,15 @@ import json
 from pathlib import Path
 from typing import Dict, Any, List
 from core.logger import logger
+from core.telemetry.metrics import metrics
 from fpdf import FPDF
 import datetime
 
 REPORT_DIR = Path(__file__).parent.parent.parent / "reports"
+REPORT_DIR.mkdir(parents=True, exist_ok=True)
 
 class ReportGenerator:
+    @metrics.timed("report_json")
     def generate_json(self, analysis_stats: Dict[str, Any]):
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = REPORT_DIR / f"report_{timestamp}.json"
@@ -18,6 +21,7 @@ class ReportGenerator:
         logger.info(f"JSON Report generated: {filename}")
         return str(filename)
 
+    @metrics.timed("report_pdf")
     def generate_pdf(self, analysis_stats: Dict[str, Any]):
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = REPORT_DIR / f"report_{timestamp}.pdf"
@@ -38,16 +42,22 @@ class ReportGenerator:
         pdf.cell(0, 10, "1. Executive Summary", ln=1)
         pdf.set_font("Arial", size=11)
         
-        score = analysis_stats.get('total_score', 0)
-        total_requests = analysis_stats.get('total_requests', 0)
-        blocked = analysis_stats.get('blocked_requests', 0)
-        passed = analysis_stats.get('passed_requests', 0) # Bypasses
+        # A/B mode: one score per target, counts summed over all targets under 'pooled'
+        targets = analysis_stats.get('targets', {})
+        counts = analysis_stats.get('pooled', analysis_stats)
+        total_requests = counts.get('total_requests', 0)
+        blocked = counts.get('blocked_requests', 0)
+        passed = counts.get('passed_requests', 0) # Bypasses
         
-        pdf.cell(0, 8, f"Total Score: {score}/100", ln=1)
+        if targets:
+            for name, target_stats in targets.items():
+                pdf.cell(0, 8, f"Score [{name}]: {target_stats.get('total_score', 0)}/100", ln=1)
+        else:
+            pdf.cell(0, 8, f"Total Score: {analysis_stats.get('total_score', 0)}/100", ln=1)
         pdf.cell(0, 8, f"Total Traffic: {total_requests} Requests", ln=1)
         pdf.cell(0, 8, f"Blocked Attacks: {blocked}", ln=1)
         pdf.cell(0, 8, f"Successful Bypasses: {passed}", ln=1)
-        pdf.cell(0, 8, f"False Positives: {analysis_stats.get('false_positives', 0)}", ln=1)
+        pdf.cell(0, 8, f"False Positives: {counts.get('false_positives', 0)}", ln=1)
         pdf.ln(5)
 
         # 2. Attack Breakdown
@@ -60,7 +70,7 @@ class ReportGenerator:
         # Ideally, we should pass the 'details' list.
         # Assuming analysis_stats has 'details' key which is a list of bypasses
         
-        bypasses = analysis_stats.get('bypasses', [])
+        bypasses = counts.get('bypasses', [])
         if bypasses:
             pdf.set_text_color(200, 0, 0)
             pdf.cell(0, 8, f"CRITICAL: {len(bypasses)} WAF Bypasses Detected", ln=1)
@@ -0,0 +1,71 @@
+import json
+from pathlib import Path
+from typing import Dict, Any, Optional
+from xml.sax.saxutils import escape, quoteattr
+from core.analyzer.detector import DetectionEngine
+
+class StreamingReportWriter:
+    """
+    Writes results to JSON Lines and JUnit XML as they complete, so partial
+    reports survive an interrupted run and nothing is buffered until the end.
+    """
+
+    def __init__(self, json_path: Optional[Path] = None, junit_path: Optional[Path] = None):
+        self.json_path = json_path
+        self.junit_path = junit_path
+        self.detector = DetectionEngine()
+        self._json = None
+        self._junit = None
+
+    def open(self):
+        if self.json_path:
+            self.json_path.parent.mkdir(parents=True, exist_ok=True)
+            self._json = open(self.json_path, "w")
+        if self.junit_path:
+            self.junit_path.parent.mkdir(parents=True, exist_ok=True)
+            self._junit = open(self.junit_path, "w")
+            self._junit.write('<?xml version="1.0" encoding="UTF-8"?>\n<testsuites>\n<testsuite name="WBT">\n')
+        return self
+
+    def write(self, result: Dict[str, Any]):
+        verdict = self.detector.classify(result)
+        if self._json:
+            self._json.write(json.dumps({**result, "verdict": verdict}) + "\n")
+            self._json.flush()
+        if self._junit:
+            self._junit.write(self._testcase(result, verdict))
+            self._junit.flush()
+
+    def close(self, stats: Optional[Dict[str, Any]] = None):
+        if self._json:
+            if stats is not None:
+                summary = {k: v for k, v in stats.items() if k not in ("bypasses", "failures")}
+                self._json.write(json.dumps({"summary": summary}) + "\n")
+            self._json.close()
+            self._json = None
+        if self._junit:
+            self._junit.write("</testsuite>\n</testsuites>\n")
+            self._junit.close()
+            self._junit = None
+
+    def _testcase(self, result: Dict[str, Any], verdict: str) -> str:
+        if "vector_id" in result:
+            classname = f"attack.{result.get('category', 'Unknown')}"
+            name = f"{result['vector_id']}#{result.get('mutation_id', 0)}"
+        else:
+            classname = "legit"
+            name = f"{result.get('scenario')}#{result.get('user_id', 0)}"
+        if "target" in result:
+            classname = f"{result['target']}.{classname}"
+        time_s = result.get("latency", 0) / 1000
+
+        case = f'<testcase classname={quoteattr(classname)} name={quoteattr(name)} time="{time_s:.4f}"'
+        if verdict == "error":
+            return f'{case}><error message={quoteattr(result["error"])}/></testcase>\n'
+        if verdict == "bypass":
+            detail = escape(f"status={result.get('status')} payload={result.get('payload')}")
+            return f'{case}><failure message="WAF bypass" type="bypass">{detail}</failure></testcase>\n'
+        if verdict == "false_positive":
+            detail = escape(f"status={result.get('status')}")
+            return f'{case}><failure message="Legitimate request blocked" type="false_positive">{detail}</failure></testcase>\n'
+        return f"{case}/>\n"
@@ -0,0 +1,138 @@
+import math
+from statistics import NormalDist
+from typing import Any, Dict, List, Tuple
+from core.config import ScoringConfig
+
+def wilson_interval(successes: int, n: int, confidence: float = 0.95) -> Tuple[float, float]:
+    """
+    Wilson score interval for a binomial proportion.
+    """
+    if n <= 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+    p = successes / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+class ScoreAggregator:
+    """
+    Streaming counters behind the score. Every update is O(1) and the
+    snapshot only walks the (small) category / family / rule tables, so the
+    live score can be recomputed at any time during a run.
+    """
+
+    def __init__(self, config: ScoringConfig):
+        self.config = config
+        self.categories: Dict[str, List[int]] = {} # category -> [blocked, attempts]
+        self.families: Dict[str, List[int]] = {} # mutation family -> [blocked, attempts]
+        self.legit = [0, 0] # [false positives, attempts]
+        self.rules: Dict[str, List[int]] = {} # rule id -> [blocked attack hits, bypass hits, legit hits]
+        self.errors = 0
+
+    def add(self, result: Dict[str, Any], verdict: str):
+        if verdict == "error":
+            self.errors += 1
+            return
+        if verdict in ("blocked", "bypass"):
+            hit = 1 if verdict == "blocked" else 0
+            for table, key in ((self.categories, result.get("category", "Unknown")),
+                               (self.families, result.get("mutation_family", "original"))):
+                counts = table.setdefault(key, [0, 0])
+                counts[0] += hit
+                counts[1] += 1
+        else:
+            self.legit[0] += 1 if verdict == "false_positive" else 0
+            self.legit[1] += 1
+
+    def add_rule_hits(self, rule_ids: List[str], verdict: str):
+        """
+        Counts the rules triggered by one request, each rule at most once.
+        """
+        if verdict == "error":
+            return # Not part of any rate the shares are relative to
+        # Anomaly scoring rules also fire on attacks that still get through
+        column = {"blocked": 0, "bypass": 1}.get(verdict, 2)
+        for rule_id in dict.fromkeys(str(r) for r in rule_ids):
+            self.rules.setdefault(rule_id, [0, 0, 0])[column] += 1
+
+    def _rate(self, successes: int, n: int) -> Dict[str, Any]:
+        low, high = wilson_interval(successes, n, self.config.confidence)
+        return {
+            "rate": round(successes / n, 4) if n else None,
+            "ci_low": round(low, 4),
+            "ci_high": round(high, 4),
+            "n": n,
+        }
+
+    def detection(self) -> Tuple[float, float, float]:
+        """
+        Category-weighted block rate of attacks as (point, low, high).
+        """
+        total_weight = point = low = high = 0.0
+        for category, (blocked, n) in self.categories.items():
+            if not n:
+                continue
+            w = self.config.category_weights.get(category, 1.0)
+            c_low, c_high = wilson_interval(blocked, n, self.config.confidence)
+            total_weight += w
+            point += w * blocked / n
+            low += w * c_low
+            high += w * c_high
+        if not total_weight:
+            return 1.0, 0.0, 1.0
+        return point / total_weight, low / total_weight, high / total_weight
+
+    def score(self) -> Tuple[float, float, float]:
+        """
+        Returns (score, low, high) on a 0-100 scale.
+        """
+        parts = []
+        if self.categories:
+            parts.append((self.config.bypass_weight, self.detection()))
+        fp, n = self.legit
+        if n:
+            fp_low, fp_high = wilson_interval(fp, n, self.config.confidence)
+            # Higher is better: use the legit pass rate
+            parts.append((self.config.fp_weight, (1 - fp / n, 1 - fp_high, 1 - fp_low)))
+
+        total_weight = sum(w for w, _ in parts)
+        if not total_weight:
+            return 100.0, 100.0, 100.0
+        values = [sum(w * v[i] for w, v in parts) / total_weight * 100 for i in range(3)]
+        return round(values[0], 2), round(values[1], 2), round(values[2], 2)
+
+    def snapshot(self) -> Dict[str, Any]:
+        score, low, high = self.score()
+        detection, d_low, d_high = self.detection()
+        blocked_attacks = sum(b for b, _ in self.categories.values())
+        fp, legit_n = self.legit
+        attacks = sum(n for _, n in self.categories.values())
+        return {
+            "score": score,
+            "totals": {
+                "sent": attacks + legit_n + self.errors,
+                "blocked": blocked_attacks,
+                "bypassed": attacks - blocked_attacks,
+                "false_positives": fp,
+                "errors": self.errors,
+            },
+            "score_ci": [low, high],
+            "detection_rate": {"rate": round(detection, 4), "ci_low": round(d_low, 4), "ci_high": round(d_high, 4),
+                               "n": attacks},
+            "false_positive_rate": self._rate(fp, legit_n),
+            "categories": {k: self._rate(b, n) for k, (b, n) in sorted(self.categories.items())},
+            "mutation_families": {k: self._rate(b, n) for k, (b, n) in sorted(self.families.items())},
+            # Share of blocked attacks each rule fired on, and share of legit requests it hit
+            "rules": {
+                rule_id: {
+                    "blocked_hits": b,
+                    "bypass_hits": p,
+                    "legit_hits": l,
+                    "detection_share": self._rate(b, blocked_attacks),
+                    "false_positive_share": self._rate(l, legit_n),
+                }
+                for rule_id, (b, p, l) in sorted(self.rules.items())
+            },
+        }
@@ -1,35 +1,99 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
+from core.config import settings
+from core.analyzer.detector import DetectionEngine
+from core.scoring.aggregator import ScoreAggregator
 
 class ScoringEngine:
-    def calculate_score(self, stats: Dict[str, int]) -> Dict[str, Any]:
+    """
+    Rate-based scoring fed incrementally with results as they complete.
+    """
+
+    def __init__(self):
+        self.detector = DetectionEngine()
+        self.reset()
+
+    def reset(self):
+        self.aggregator = ScoreAggregator(settings.scoring)
+        self.targets: Dict[str, ScoreAggregator] = {} # A/B mode, per target name
+
+    def _target(self, name: str) -> ScoreAggregator:
+        aggregator = self.targets.get(name)
+        if aggregator is None:
+            aggregator = self.targets[name] = ScoreAggregator(settings.scoring)
+        return aggregator
+
+    def observe(self, result: Dict[str, Any]):
+        verdict = self.detector.classify(result)
+        self.aggregator.add(result, verdict)
+        if "target" in result:
+            self._target(result["target"]).add(result, verdict)
+
+    def observe_rules(self, matches: List[Tuple[List[str], Dict[str, Any]]]):
         """
-        Calculate a security score (0-100).
+        Feeds (rule ids, result) pairs from DetectionEngine.correlate().
+        """
+        for rule_ids, result in matches:
+            verdict = self.detector.classify(result)
+            self.aggregator.add_rule_hits(rule_ids, verdict)
+            if "target" in result:
+                self._target(result["target"]).add_rule_hits(rule_ids, verdict)
+
+    def live_score(self) -> Dict[str, Any]:
+        if self.targets:
+            # A/B mode: a pooled score would describe no single WAF, only the request totals are shared
+            return {
+                "totals": self.aggregator.snapshot()["totals"],
+                "targets": {name: a.snapshot() for name, a in sorted(self.targets.items())},
+            }
+        return self.aggregator.snapshot()
+
+    def calculate_score(self, stats: Dict[str, Any]) -> Dict[str, Any]:
         """
-        base_score = 100
-        
-        # Penalties
-        # False Negative (Bypass) is critical: -10 points each
-        # False Positive is bad for usability: -5 points each
-        
-        # The detector returns 'false_negatives' (which are bypasses)
-        bypassed_count = stats.get("false_negatives", 0)
-        false_positives = stats.get("false_positives", 0)
-        
-        penalty = (bypassed_count * 10) + (false_positives * 5)
-        
-        final_score = max(0, base_score - penalty)
-        
+        Calculate a security score (0-100) from the streamed aggregates.
+        In A/B mode there is no overall score, only per-target scores and a
+        side-by-side view.
+        """
+        if self.targets:
+            targets = {name: self._score(a) for name, a in sorted(self.targets.items())}
+            return {"targets": targets, "comparison": self._compare(targets)}
+        return self._score(self.aggregator)
+
+    def _compare(self, targets: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Pivots per-target rates into {dimension: {key: {target: rate}}}.
+        """
+        comparison: Dict[str, Any] = {"total_score": {name: t["total_score"] for name, t in targets.items()}}
+        for dimension in ("categories", "mutation_families"):
+            table: Dict[str, Dict[str, Any]] = {}
+            for name, t in targets.items():
+                for key, rate in t[dimension].items():
+                    table.setdefault(key, {})[name] = rate["rate"]
+            comparison[dimension] = table
+        comparison["false_positive_rate"] = {name: t["details"]["false_positive_rate"]["rate"] for name, t in targets.items()}
+        return comparison
+
+    def _score(self, aggregator: ScoreAggregator) -> Dict[str, Any]:
+        snapshot = aggregator.snapshot()
+        final_score = snapshot["score"]
+
         grade = "A"
         if final_score < 90: grade = "B"
         if final_score < 70: grade = "C"
         if final_score < 50: grade = "D"
         if final_score < 30: grade = "F"
-        
+
         return {
             "total_score": final_score, # Consistent naming with orchestrator expectation
             "grade": grade,
+            "score_ci": snapshot["score_ci"],
             "details": {
-                "bypass_penalty": bypassed_count * 10,
-                "fp_penalty": false_positives * 5
-            }
+                "detection_rate": snapshot["detection_rate"],
+                "false_positive_rate": snapshot["false_positive_rate"],
+                "bypass_weight": settings.scoring.bypass_weight,
+                "fp_weight": settings.scoring.fp_weight,
+                "confidence": settings.scoring.confidence
+            },
+            "categories": snapshot["categories"],
+            "mutation_families": snapshot["mutation_families"],
+            "rules": snapshot["rules"]
         }
@@ -0,0 +1,161 @@
+import time
+import asyncio
+import functools
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+from core.analyzer.histogram import LatencyHistogram
+
+# Bucket upper bounds in seconds for phase / lag histograms
+SECONDS_BOUNDS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300]
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics store with Prometheus text exposition.
+    Also accumulates per-phase wall time for the current run so it can be
+    attached to the report.
+    """
+
+    def __init__(self):
+        self.meta: Dict[str, Tuple[str, str]] = {}
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.gauges: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, LatencyHistogram]] = {}
+        self.run_phases: Dict[str, float] = {}
+        self._lag_task: Optional[asyncio.Task] = None
+
+    def describe(self, name: str, kind: str, help_text: str):
+        self.meta[name] = (kind, help_text)
+        store = {"counter": self.counters, "gauge": self.gauges, "histogram": self.histograms}[kind]
+        store.setdefault(name, {})
+
+    @staticmethod
+    def _labels(labels: Dict[str, Any]) -> Labels:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        series = self.counters[name]
+        key = self._labels(labels)
+        series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels):
+        self.gauges[name][self._labels(labels)] = value
+
+    def add(self, name: str, delta: float, **labels):
+        series = self.gauges[name]
+        key = self._labels(labels)
+        series[key] = series.get(key, 0.0) + delta
+
+    def observe(self, name: str, value: float, **labels):
+        series = self.histograms[name]
+        key = self._labels(labels)
+        hist = series.get(key)
+        if hist is None:
+            hist = series[key] = LatencyHistogram(SECONDS_BOUNDS)
+        hist.add(value)
+
+    # --- Phase spans ---
+
+    def record_phase(self, phase: str, seconds: float):
+        self.observe("wbt_phase_duration_seconds", seconds, phase=phase)
+        self.run_phases[phase] = self.run_phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def span(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_phase(phase, time.perf_counter() - start)
+
+    def timed(self, phase: str):
+        """
+        Decorator form of span() for sync and async functions.
+        """
+        def decorator(func):
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(phase):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(phase):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def reset_run(self, **phases: float):
+        """
+        Starts a new run summary, seeded with `phases` done once before the run.
+        """
+        self.run_phases = dict(phases)
+
+    def phase_summary(self) -> Dict[str, float]:
+        """
+        Cumulative seconds per phase for the current run. Per-request phases
+        (network_wait, logging) are summed over concurrent requests, so they
+        can exceed wall time.
+        """
+        return {phase: round(seconds, 4) for phase, seconds in self.run_phases.items()}
+
+    # --- Event loop lag ---
+
+    def start_loop_monitor(self, interval: float = 0.5):
+        """
+        Starts (once per event loop) a task measuring scheduling delay.
+        """
+        loop = asyncio.get_running_loop()
+        if self._lag_task and not self._lag_task.done() and self._lag_task.get_loop() is loop:
+            return
+        self._lag_task = loop.create_task(self._monitor_loop(interval))
+
+    async def _monitor_loop(self, interval: float):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            lag = max(0.0, loop.time() - start - interval)
+            self.set("wbt_event_loop_lag_seconds", lag)
+            self.observe("wbt_event_loop_lag_seconds_histogram", lag)
+
+    # --- Exposition ---
+
+    @staticmethod
+    def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(labels) + ([extra] if extra else [])
+        if not pairs:
+            return ""
+        body = ",".join(f'{k}="{v}"'.replace("\n", " ") for k, v in pairs)
+        return "{" + body + "}"
+
+    def render(self) -> str:
+        lines = []
+        for name, (kind, help_text) in self.meta.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "histogram":
+                for labels, hist in self.histograms[name].items():
+                    cumulative = 0
+                    for bound, count in zip(hist.bounds + ["+Inf"], hist.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{self._format_labels(labels, ('le', str(bound)))} {cumulative}")
+                    lines.append(f"{name}_sum{self._format_labels(labels)} {hist.sum}")
+                    lines.append(f"{name}_count{self._format_labels(labels)} {hist.count}")
+            else:
+                series = self.counters[name] if kind == "counter" else self.gauges[name]
+                for labels, value in series.items():
+                    lines.append(f"{name}{self._format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+metrics.describe("wbt_requests_total", "counter", "Requests sent by WBT, by traffic kind and response status")
+metrics.describe("wbt_dedup_hits_total", "counter", "Requests answered from the dedup verdict cache instead of being sent")
+metrics.describe("wbt_requests_in_flight", "gauge", "Requests currently awaiting a response")
+metrics.describe("wbt_benchmark_running", "gauge", "1 while a benchmark run is in progress")
+metrics.describe("wbt_event_loop_lag_seconds", "gauge", "Most recent event loop scheduling delay")
+metrics.describe("wbt_event_loop_lag_seconds_histogram", "histogram", "Event loop scheduling delay")
+metrics.describe("wbt_phase_duration_seconds", "histogram", "Duration of instrumented benchmark phases")
@@ -0,0 +1,59 @@
+import pstats
+import cProfile
+import datetime
+from pathlib import Path
+from typing import Optional
+from core.logger import logger
+
+REPORT_DIR = Path(__file__).parent.parent.parent / "reports"
+
+class RunProfiler:
+    """
+    Optional sampling/deterministic profiler wrapped around a benchmark run.
+    'pyinstrument' writes an HTML flame view, 'cprofile' a .prof dump plus a
+    text summary; output lands in reports/ next to the JSON/PDF reports.
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind.lower()
+        self._profiler = None
+        if self.kind == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+                self._profiler = Profiler(async_mode="enabled")
+            except ImportError:
+                logger.warning("pyinstrument not installed, falling back to cProfile")
+                self.kind = "cprofile"
+        if self.kind == "cprofile":
+            self._profiler = cProfile.Profile()
+        elif self._profiler is None:
+            raise ValueError(f"Unknown profiler: {kind}")
+
+    def start(self):
+        if self.kind == "pyinstrument":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self) -> Optional[str]:
+        """
+        Stops profiling and writes the output, returns the main output path.
+        """
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        REPORT_DIR.mkdir(parents=True, exist_ok=True)
+        try:
+            if self.kind == "pyinstrument":
+                self._profiler.stop()
+                filename = REPORT_DIR / f"profile_{timestamp}.html"
+                filename.write_text(self._profiler.output_html())
+            else:
+                self._profiler.disable()
+                filename = REPORT_DIR / f"profile_{timestamp}.prof"
+                self._profiler.dump_stats(str(filename))
+                with open(REPORT_DIR / f"profile_{timestamp}.txt", "w") as f:
+                    pstats.Stats(self._profiler, stream=f).sort_stats("cumulative").print_stats(60)
+        except Exception as e:
+            logger.error(f"Failed to write profile output: {e}")
+            return None
+        logger.info(f"Profile written: {filename}")
+        return str(filename)
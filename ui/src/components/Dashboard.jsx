@@ -1,5 +1,5 @@
 import React, { useState, useEffect, useRef } from 'react';
-import { Play, Terminal, Shield, AlertTriangle, X, Server, Activity, Clock, Book } from 'lucide-react';
+import { Play, Terminal, Shield, AlertTriangle, X, Server, Activity, Clock, Book, Gauge } from 'lucide-react';
 import axios from 'axios';
 import { AreaChart, Area, XAxis, YAxis, Tooltip, ResponsiveContainer } from 'recharts';
 import { motion } from 'framer-motion';
@@ -13,6 +13,8 @@ const Dashboard = ({ setActiveTab }) => {
         bypassed: 0,
         fps: 0
     });
+    // Converging score of the current (or last) run, one row per target in A/B mode
+    const [scores, setScores] = useState([]);
 
     // Live chart data
     const [chartData, setChartData] = useState(
@@ -79,16 +81,26 @@ const Dashboard = ({ setActiveTab }) => {
                     return newData;
                 });
 
-                if (showRunning) {
-                    // During run, we simulate metrics climbing up or rely on real-time stream if available
-                    // For now, let's just make it look active
-                    setMetrics(prev => ({
-                        sent: prev.sent + 1,
-                        blocked: prev.blocked, // We don't have real-time stream for this yet
-                        bypassed: prev.bypassed,
-                        fps: prev.fps
-                    }));
-                } else if (!showRunning) {
+                // The scorer keeps the last run's aggregates until the next one starts
+                try {
+                    const live = (await axios.get('/api/v1/stats/live')).data;
+                    const sources = live.targets ? Object.entries(live.targets) : [[null, live]];
+                    setScores(sources
+                        .filter(([, s]) => s.totals.sent > 0)
+                        .map(([name, s]) => ({ name, score: s.score, low: s.score_ci[0], high: s.score_ci[1] })));
+                    if (showRunning) {
+                        // During run, read the incrementally updated counters from the scorer
+                        const t = live.totals;
+                        setMetrics({
+                            sent: t.sent,
+                            blocked: t.blocked,
+                            bypassed: t.bypassed,
+                            fps: t.false_positives
+                        });
+                    }
+                } catch (e) { }
+
+                if (!showRunning) {
                     // If NOT running, fetch the FINAL EXACT STATS from backend
                     // This ensures the cards show the real data when done
                     try {
@@ -117,6 +129,7 @@ const Dashboard = ({ setActiveTab }) => {
             setStatus('STARTING');
             benchmarkStartTime.current = Date.now();
             setMetrics({ sent: 0, blocked: 0, bypassed: 0, fps: 0 }); // Reset visually
+            setScores([]);
             await axios.post('/api/v1/benchmark/start');
         } catch (err) {
             console.error("Start failed", err);
@@ -245,6 +258,33 @@ const Dashboard = ({ setActiveTab }) => {
                         </button>
                     </div>
 
+                    {/* Live Score */}
+                    <div className="bg-zinc-900/30 border border-zinc-800 rounded-xl p-4">
+                        <div className="mb-3 flex items-center justify-between">
+                            <h4 className="text-xs font-semibold text-zinc-400 uppercase tracking-wider">Live Score</h4>
+                            <Gauge size={14} className="text-zinc-500" />
+                        </div>
+                        {scores.length === 0 && (
+                            <p className="text-xs text-zinc-600">No results yet.</p>
+                        )}
+                        {scores.map(s => (
+                            <div key={s.name || 'score'} className="mb-2 last:mb-0">
+                                <div className="flex items-baseline justify-between">
+                                    <span className="text-xs font-mono text-zinc-400">{s.name || 'Score'}</span>
+                                    <span className="text-2xl font-bold text-white tracking-tight">{s.score.toFixed(1)}</span>
+                                </div>
+                                {/* Interval bar on the 0-100 scale, narrows as results arrive */}
+                                <div className="relative h-1.5 mt-1 rounded-full bg-zinc-800">
+                                    <div
+                                        className="absolute h-full rounded-full bg-blue-500/60"
+                                        style={{ left: `${s.low}%`, width: `${Math.max(s.high - s.low, 0.5)}%` }}
+                                    />
+                                </div>
+                                <p className="text-[10px] text-zinc-600 mt-1 font-mono">CI {s.low.toFixed(1)} - {s.high.toFixed(1)}</p>
+                            </div>
+                        ))}
+                    </div>
+
                     {/* Mini Traffic Chart */}
                     <div className="flex-1 bg-zinc-900/30 border border-zinc-800 rounded-xl p-4 flex flex-col min-h-0">
                         <div className="mb-2 flex items-center justify-between">
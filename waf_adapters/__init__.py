@@ -1,11 +1,13 @@
 from .base import BaseWAFAdapter
 from .modsecurity import ModSecurityAdapter
-from core.config import settings
+from typing import Optional
+from core.config import settings, WAFConfig
 
-def get_waf_adapter() -> BaseWAFAdapter:
-    adapter_type = settings.waf.adapter_type.lower()
+def get_waf_adapter(config: Optional[WAFConfig] = None) -> BaseWAFAdapter:
+    config = config or settings.waf
+    adapter_type = config.type.lower()
     
     if adapter_type == "modsecurity":
-        return ModSecurityAdapter()
+        return ModSecurityAdapter(config)
     
     raise ValueError(f"Unknown WAF adapter type: {adapter_type}")
@@ -1,15 +1,23 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
-from core.config import settings
+from typing import Dict, Any, List, Optional
+from core.config import settings, WAFConfig
 
 class BaseWAFAdapter(ABC):
-    def __init__(self):
-        self.config = settings.waf
+    def __init__(self, config: Optional[WAFConfig] = None):
+        self.config = config or settings.waf
+
+    def mark(self):
+        """
+        Called when a run starts. Adapters that can should only return log
+        entries written after this point from get_logs().
+        """
+        pass
 
     @abstractmethod
-    async def get_logs(self, start_time: float, end_time: float) -> List[Dict[str, Any]]:
+    async def get_logs(self, start_time: float, end_time: float, id_prefix: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        Retrieve logs from the WAF for the given time window.
+        Retrieve logs from the WAF for the given time window. With `id_prefix`,
+        entries whose WBT request id can't start with it may be skipped.
         """
         pass
 
@@ -1,45 +1,60 @@
+import os
 import json
-import aiofiles
-from typing import List, Dict, Any
+import asyncio
+from typing import List, Dict, Any, Optional
 from pathlib import Path
+from core.config import WAFConfig
 from core.logger import logger
 from .base import BaseWAFAdapter
+from core.attack_engine.templates import REQUEST_ID_HEADER
 
 class ModSecurityAdapter(BaseWAFAdapter):
     """
     Adapter for ModSecurity (v3/NGINX) using standard JSON logging.
     """
+
+    def __init__(self, config: Optional[WAFConfig] = None):
+        super().__init__(config)
+        self.log_path = Path(self.config.log_path)
+        if not self.log_path.is_absolute():
+            self.log_path = Path(__file__).parent.parent / self.log_path
+        self._offset = 0 # Audit log size at mark(), earlier entries belong to other runs
     
     async def check_health(self) -> bool:
         # For simplicity, we assume if we can read the log file path or reach management URL, it's healthy.
         # Here we just check if log file logic is configured.
         return True
 
-    async def get_logs(self, start_time: float, end_time: float) -> List[Dict[str, Any]]:
-        log_path = Path(self.config.logs.get("path", "/var/log/modsec_audit.log"))
-        logs = []
-        
-        if not log_path.exists():
-            logger.warning(f"ModSecurity log file not found at {log_path}")
+    def mark(self):
+        self._offset = self.log_path.stat().st_size if self.log_path.exists() else 0
+
+    async def get_logs(self, start_time: float, end_time: float, id_prefix: Optional[str] = None) -> List[Dict[str, Any]]:
+        if not self.log_path.exists():
+            logger.warning(f"ModSecurity log file not found at {self.log_path}")
             return []
 
-        # This is a naive implementation reading the whole file. 
-        # In production, this would tail or seek based on timestamp.
+        # The serial audit log is append only: read what was written since mark(),
+        # in a thread so a large log doesn't stall in-flight traffic
         try:
-            async with aiofiles.open(log_path, mode='r') as f:
-                async for line in f:
-                    try:
-                        entry = json.loads(line)
-                        parsed = self.parse_log_entry(entry)
-                        
-                        # Filter by time window if timestamps match (converting ModSec time can be tricky, assuming simplified)
-                        # For this MVP, we return all and let Analyzer filter context.
-                        logs.append(parsed)
-                    except json.JSONDecodeError:
-                        continue
-        except Exception as e:
+            return await asyncio.to_thread(self._read_logs, id_prefix)
+        except OSError as e:
             logger.error(f"Error reading ModSec logs: {e}")
-            
+            return []
+
+    def _read_logs(self, id_prefix: Optional[str]) -> List[Dict[str, Any]]:
+        needle = id_prefix.encode() if id_prefix else None
+        logs = []
+        with open(self.log_path, "rb") as f:
+            # Smaller than at mark() => rotated or truncated since, read it all
+            f.seek(self._offset if f.seek(0, os.SEEK_END) >= self._offset else 0)
+            for line in f:
+                # Cheap substring test first, only this run's entries are parsed
+                if needle and needle not in line:
+                    continue
+                try:
+                    logs.append(self.parse_log_entry(json.loads(line)))
+                except json.JSONDecodeError:
+                    continue
         return logs
 
     def parse_log_entry(self, entry: Dict[str, Any]) -> Dict[str, Any]:
@@ -56,6 +71,13 @@ class ModSecurityAdapter(BaseWAFAdapter):
         for msg in messages:
             if "details" in msg:
                 rule_ids.append(msg["details"].get("ruleId"))
+
+        # WBT tags every request, lets the analyzer map entries back to results
+        wbt_request_id = None
+        for name, value in transaction.get("request", {}).get("headers", {}).items():
+            if name.lower() == REQUEST_ID_HEADER.lower():
+                wbt_request_id = value
+                break
         
         # Determine strict action from HTTP response code or details
         # In ModSec, often 403 means blocked.
@@ -64,9 +86,10 @@ class ModSecurityAdapter(BaseWAFAdapter):
             
         return {
             "timestamp": transaction.get("time_stamp"),
-            "request_id": transaction.get("id"),
+            "request_id": transaction.get("unique_id", transaction.get("id")),
             "rules_triggered": rule_ids,
             "action": action,
             "client_ip": transaction.get("client_ip"),
-            "uri": transaction.get("request", {}).get("uri")
+            "uri": transaction.get("request", {}).get("uri"),
+            "wbt_request_id": wbt_request_id
         }